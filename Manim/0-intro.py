@@ -2,74 +2,10 @@ from random import seed, random
 from math import pi, cos, sin
 from manim import *
 from fast_voronoi import *
-from fast_voronoi.polygons import make_polygons
 
 from theme import *
 from utils import *
-
-
-class VoronoiAnim:
-    def __init__(self, bounds: Bounds, cells: list[Cell],
-                 colors: list[tuple], style_funcs, show_dots: bool = False,
-                 buffer: int = 10):
-        self.bounds = bounds
-        self.cells = cells
-        self.colors = colors
-
-        self.style_polygon, self.style_dot = style_funcs
-
-        # could be a varying number of polygons per cell, so add a small buffer
-        length = len(cells)+buffer
-        dummy = [(-1, 0, 0), (1, 0, 0), (0, 1.41, 0)]
-        self.polygons = VGroup(Polygon(*dummy) for _ in range(length))
-
-        if show_dots:
-            self.dots = VGroup(*(Dot((cell.pos.x, cell.pos.y, 0),
-                                     radius=.2) for cell in cells))
-        else:
-            self.dots = VGroup()
-
-        self.update()
-
-    def update(self):
-        polygons = make_polygons(options, self.bounds, self.cells)
-
-        index = 0
-        for i, points_raw in polygons:
-            points = [(u.x, u.y, 0) for u in points_raw]
-
-            if index >= len(self.polygons):
-                raise ValueError('Not enough polygons in VoronoiAnim buffer')
-            polygon = self.polygons[index]
-
-            # hard-code hide polygon if too small
-            if len(points) < 6:
-                polygon.set_opacity(0)
-            else:
-                polygon.set_points_as_corners(points)
-                polygon.set_opacity(1) # fallback
-                self.style_polygon(polygon, self.colors[i])
-
-            index += 1
-
-        # hide the unused polygons
-        for i in range(index, len(self.polygons)):
-            self.polygons[i].set_opacity(0)
-
-        for i, dot in enumerate(self.dots):
-            self.style_dot(dot, self.colors[i])
-            u = self.cells[i].pos
-            dot.move_to((u.x, u.y, 0))
-
-    def play(self, scene: Scene, func, **kwargs):
-        def updater(_):
-            func(self, t.get_value())
-            self.update()
-
-        t = ValueTracker(0)
-        self.polygons.add_updater(updater)
-        scene.play(t.animate.set_value(1), **kwargs)
-        self.polygons.clear_updaters()
+from profiles import PreviewWaits
 
 
 class Dance:
@@ -214,20 +150,12 @@ class Dance:
         white = voronoi.cells[1]
         white.weight = 5 + 100*t
 
-class Main(Scene):
+class Main(PreviewWaits, Scene):
     def construct(self):
         Text.set_default(color=FG, stroke_color=FG)
         self.camera.background_color = BG
 
-        def style_poly_transparent(polygon: Polygon, color: tuple):
-            polygon.set_stroke(color)
-            polygon.set_fill(color, opacity=.5)
-
-        def style_poly_fill(polygon: Polygon, color: tuple):
-            polygon.set_stroke(width=0)
-            polygon.set_fill(color, opacity=1)
-
-        def style_dot_invert(dot: Dot, color: ManimColor):
+        def invert(color: ManimColor):
             r, g, b = color.to_rgb()
             r, g, b = int(r*255), int(g*255), int(b*255)
 
@@ -236,10 +164,7 @@ class Main(Scene):
             else:
                 r, g, b = max(r-50, 0), max(g-50, 0), max(b-50, 0)
 
-            dot.set_color(ManimColor.from_rgb((r, g, b)))
-
-        def style_none(_, __):
-            pass
+            return ManimColor.from_rgb((r, g, b))
 
         dance = Dance(self.camera)
         bounds = dance.bounds
@@ -247,8 +172,15 @@ class Main(Scene):
         cells = [Cell(v2(i, 0), 1) for i in range(8)]
         colors = [BG, FG] + THEME2
 
-        funcs = style_poly_fill, style_dot_invert
-        voronoi = VoronoiAnim(bounds, cells, colors, funcs, True)
+        # the colors never change, so they are computed once
+        style_poly_fill = TableStyle(fill=color_table(colors, 1), stroke_width=0)
+        inverted = color_table(map(invert, colors))
+        style_dot_invert = TableStyle(fill=inverted, stroke=inverted)
+
+        dots = VGroup(Dot((cell.pos.x, cell.pos.y, 0), radius=.2) for cell in cells)
+        voronoi = DiagramAnimation(bounds, cells, style_poly_fill, style_dot_invert,
+                                   dots=dots, min_vertices=6)
+        play = lambda func, **kwargs: voronoi.play(self, lambda t: func(voronoi, t), **kwargs)
 
         text1 = Text('Headphones recommended', font_size=20)
         text1.set_stroke(FG)
@@ -260,17 +192,17 @@ class Main(Scene):
         self.add(voronoi.dots)
         dance.init1(voronoi)
 
-        voronoi.play(self, dance.arrive1, run_time=2, rate_func=rush_from)
+        play(dance.arrive1, run_time=2, rate_func=rush_from)
         self.wait(1.5)
-        voronoi.play(self, dance.arrive2, run_time=4, rate_func=double_smooth)
+        play(dance.arrive2, run_time=4, rate_func=double_smooth)
         self.wait(2.5)
-        voronoi.play(self, dance.close, run_time=2, rate_func=there_and_back)
+        play(dance.close, run_time=2, rate_func=there_and_back)
         self.wait(1.5)
-        voronoi.play(self, dance.close, run_time=1, rate_func=there_and_back)
+        play(dance.close, run_time=1, rate_func=there_and_back)
         self.wait(.5)
-        voronoi.play(self, dance.updown, run_time=4, rate_func=there_and_back)
+        play(dance.updown, run_time=4, rate_func=there_and_back)
         self.wait(1.5)
-        voronoi.play(self, dance.rotate, run_time=5)
+        play(dance.rotate, run_time=5)
         text2 = Text('A presentation by D_00', font_size=30)
         text2.set_stroke(FG)
         text2.to_corner(UL)
@@ -278,9 +210,9 @@ class Main(Scene):
 
         dance.init3(voronoi)
 
-        voronoi.play(self, dance.arrive3, run_time=4, rate_func=double_smooth)
+        play(dance.arrive3, run_time=4, rate_func=double_smooth)
         self.play(FadeOut(text2), run_time=1)
-        voronoi.play(self, dance.cut, run_time=5, rate_func=there_and_back)
+        play(dance.cut, run_time=5, rate_func=there_and_back)
         self.wait(.5)
 
         everything = VGroup(voronoi.polygons, voronoi.dots)
@@ -288,20 +220,21 @@ class Main(Scene):
         dance.init_all(voronoi)
         self.play(FadeIn(everything), run_time=1)
         self.wait(1)
-        voronoi.play(self, dance.arrive_everything, run_time=3)
+        play(dance.arrive_everything, run_time=3)
         self.wait(2)
 
-        voronoi.play(self, dance.weight, run_time=7)
-        voronoi.style_poly = voronoi.style_dot = style_none
-        voronoi.play(self, dance.disappear_other, run_time=1)
-        voronoi.style_poly, voronoi.style_dot = style_poly_fill, style_dot_invert
+        play(dance.weight, run_time=7)
+        # the dots opacities are animated by disappear_other
+        voronoi.style_dot = None
+        play(dance.disappear_other, run_time=1)
+        voronoi.style_dot = style_dot_invert
         self.wait(.5)
         dance.init_swap(voronoi)
-        voronoi.play(self, dance.swap, run_time=3)
+        play(dance.swap, run_time=3)
         title = VGroup(Text('The beauty of', font_size=40, stroke_color=FG).shift(UP),
                        Text('Voronoi diagrams', font_size=40, stroke_color=FG).shift(DOWN),
                        Text('#SoME4', color=GRAY, font_size=20, stroke_color=GRAY).shift(1.5*DOWN))
         self.play(Write(title), run_time=1.5, lag_ratio=.5)
-        voronoi.play(self, dance.disappear_last, run_time=1.5, rate_func=lambda t: 1-slow_into(1-t))
+        play(dance.disappear_last, run_time=1.5, rate_func=lambda t: 1-slow_into(1-t))
         self.wait(.5)
         self.play(FadeOut(title), run_time=2)
@@ -5,10 +5,12 @@ from fast_voronoi import *
 
 from theme import *
 from utils import *
+from profiles import PreviewWaits, PRODUCTION, lag, duration
+from raster import rasterize
+from spatial import CellIndex
+from grid import PixelGrid, GridWave, lag_schedule, grouped_schedule
 
-PRODUCTION = True
-
-class Main(Scene):
+class Main(PreviewWaits, Scene):
     def construct(self):
         Text.set_default(color=FG, stroke_color=FG)
         self.camera.background_color = BG
@@ -83,24 +85,20 @@ class Main(Scene):
         res = 30
         res2 = res//2
         # warning: column first
-        screen = VGroup(Square(.2).move_to((x*.2-2.9, y*.2-2.9, 0)).set_stroke(GRAY_D, width=1)
-                        for x in range(res) for y in range(res)).set_z_index(-1)
+        screen = PixelGrid((-3, -3), (3, 3), (res, res), stroke_color=GRAY_D).set_z_index(-1)
         colors = [COL1, COL2, COL3]
 
         if PRODUCTION:
-            self.play(Write(around).set_run_time(3), Write(screen).set_run_time(2))
+            self.add(screen.image)
+            self.play(Write(around).set_run_time(3), Write(screen.lines).set_run_time(2))
         else:
             self.add(screen, around)
         self.wait()
 
         np.random.seed(0)
         rand_colors = [ManimColor.from_rgb((np.random.randint(0, 255),)*3) for i in range(900)]
-        if PRODUCTION:
-            self.play(AnimationGroup(
-                (Succession(ApplyMethod(rect.set_fill, color, 1),
-                            ApplyMethod(rect.set_fill, color, 0))
-                 for color, rect in zip(rand_colors, screen)),
-                lag_ratio=.001))
+        self.play(GridWave(screen, *lag_schedule(res*res, lag(.001), run_time=duration(2)),
+                           (color_table(rand_colors), 1), (None, 0)))
         self.wait()
 
         circles = VGroup(
@@ -118,12 +116,13 @@ class Main(Scene):
         self.wait()
 
         centers = [dot.get_center() for dot in dots]
-        closest_center_i = lambda pos, centers: \
-                min(enumerate(centers), key=lambda arg: np.sum((arg[1]-pos)**2))[0]
+        sites = np.array([center[:2] for center in centers])
+        index = CellIndex(sites)
+        closest_center_i = lambda pos: index.nearest(pos[:2])
 
         def line_updater(_):
             start = cursor.get_center()
-            target = centers[closest_center_i(start, centers)]
+            target = centers[closest_center_i(start)]
 
             line.put_start_and_end_on(start, target)
 
@@ -154,61 +153,43 @@ class Main(Scene):
         self.play(Unwrite(cursor))
 
         self.play(line.animate.set_color(COL1))
-        pixel = screen[(res2-1)*res+(res2-1)]
-        pixel.set_fill(color=COL1, opacity=0)
+        pixel = (res2-1)*res+(res2-1)
+        screen.set_fill(COL1, 0, cells=[pixel])
         self.play(AnimationGroup(
             Uncreate(line),
-            pixel.animate.set_fill(color=COL1, opacity=1),
+            GridWave(screen, [0], [1], (COL1, 1), cells=[pixel]),
             lag_ratio=.3))
 
         self.wait()
-        pixels = [[] for _ in range(len(cells))]
-        for i, rect in enumerate(screen):
-            pos = rect.get_center()
-            cindex = closest_center_i(pos, centers)
-            rect.set_fill(color=colors[cindex])
-            pixels[cindex].append(rect)
+        # same order as the screen, column first
+        labels = rasterize(sites, (-3, -3), (3, 3), (res, res)).ravel()
+        screen.set_fill(color_table(colors)[labels])
 
-        if PRODUCTION:
-            self.play(AnimationGroup(
-                (rect.animate.set_fill(opacity=.5) for rect in screen),
-                lag_ratio=.001, run_time=2))
-        else:
-            for rect in screen:
-                rect.set_fill(opacity=.5)
+        self.play(GridWave(screen, *lag_schedule(res*res, lag(.001)), (None, .5),
+                           run_time=duration(2)))
         self.wait()
 
-        if PRODUCTION:
-            self.play(AnimationGroup(
-                (AnimationGroup((Succession(ApplyMethod(rect.set_fill, color, 1),
-                                            ApplyMethod(rect.set_fill, color, .5))
-                                 for rect in group),
-                                lag_ratio=.001)
-                 for color, group in zip(colors, pixels)),
-                lag_ratio=.5))
+        self.play(GridWave(screen, *grouped_schedule(labels, lag(.001), lag(.5),
+                                                     run_time=duration(2)),
+                           (None, 1), (None, .5)))
 
-        if PRODUCTION:
-            self.play(AnimationGroup(
-                (rect.animate.set_fill(opacity=0) for rect in screen),
-                lag_ratio=.001))
-        else:
-            for rect in screen:
-                rect.set_fill(opacity=0)
+        self.play(GridWave(screen, *lag_schedule(res*res, lag(.001), run_time=duration(1)),
+                           (None, 0)))
 
         for n in range(5):
-            rect = screen[np.random.randint(0, res*res-1)]
-            pos = rect.get_center()
+            k = np.random.randint(0, res*res-1)
+            pos = screen.cell_center(k)
             lines = VGroup(Line(pos, dot.get_center(), color=COL4) for dot in dots)
             self.play(Create(lines, lag_ratio=.5), run_time=.5)
 
-            i = closest_center_i(pos, centers)
+            i = closest_center_i(pos)
             self.play((line.animate.set_stroke(
                 **({'color': FG} if i == j else {'opacity': 0}))
                        for j, line in enumerate(lines)), run_time=.5)
 
             self.play(lines[i].animate.set_stroke(color=colors[i], opacity=0),
                       Uncreate(lines[i]),
-                      rect.animate.set_fill(opacity=.5),
+                      GridWave(screen, [0], [1], (None, .5), cells=[k]),
                       lag_ratio=.3,
                       run_time=.8)
             self.wait(.2)
@@ -2,15 +2,16 @@ from manim import *
 import numpy as np
 
 from fast_voronoi import *
-from fast_voronoi.neighbors import is_neighbor
 from fast_voronoi.intersections import cells_intersections
 from fast_voronoi.polygons import make_polygons
 from fast_voronoi.utils import perp_bisector, get_equidistant
 
 from theme import *
 from utils import *
+from profiles import PreviewWaits, cell_count
+from spatial import CellIndex
 
-class Main(Scene):
+class Main(PreviewWaits, Scene):
     def construct(self):
         Text.set_default(color=FG, stroke_color=FG)
         self.camera.background_color = BG
@@ -23,21 +24,14 @@ class Main(Scene):
         np.random.seed(0)
         cells = [Cell(v2(np.random.uniform(bounds.left+1, bounds.right-1),
                          np.random.uniform(bounds.top+1, bounds.bottom-1)))
-                 for _ in range(50)]
+                 for _ in range(cell_count(50))]
         polygons, dots, _ = make_polygons_and_dots(
                 cells, bounds, THEME1, theme_func_gradient)
 
         for polygon in polygons:
             polygon.set_stroke(opacity=0)
 
-        neighbors = [[] for _ in range(len(cells))]
-        for i in range(len(cells)):
-            for j in range(len(cells)):
-                if i == j:
-                    continue
-
-                if is_neighbor(bounds, cells, i, j):
-                    neighbors[i].append(j)
+        neighbors = get_neighbors(bounds, cells)
 
         intersections = cells_intersections(bounds, cells, neighbors)
         vertices = VGroup(Dot((inter.pos.x, inter.pos.y, 0), color=FG, radius=.05)
@@ -64,7 +58,7 @@ class Main(Scene):
         self.play(everything.animate.scale(scale).shift(shift))
 
         # find the cell that is closest to the center of the screen
-        center_i = min(list(range(len(polygons))), key=lambda i: cells[i].pos.length())
+        center_i = CellIndex.from_cells(cells).nearest((0, 0))
 
         make_transparent = []
         for i, polygon in enumerate(polygons):
@@ -5,15 +5,15 @@ from manim import *
 
 from fast_voronoi import *
 from fast_voronoi.utils import perp_bisector, get_equidistant
-from fast_voronoi.neighbors import is_neighbor
 from fast_voronoi.intersections import cells_intersections
 from fast_voronoi.polygons import make_polygons
 
 from theme import *
 from utils import *
+from profiles import PreviewWaits, cell_count
 from texx import *
 
-class Main(Scene):
+class Main(PreviewWaits, Scene):
     def construct(self):
         Text.set_default(color=FG, stroke_color=FG)
         Tex.set_default(color=FG, stroke_color=FG, font_size=32)
@@ -226,21 +226,14 @@ We therefore conclude that the intersection point between $A$, $B$ and $C$, the
         np.random.seed(0)
         cells = [Cell(v2(np.random.uniform(bounds.left+1, bounds.right-1),
                          np.random.uniform(bounds.top+1, bounds.bottom-1)))
-                 for _ in range(50)]
+                 for _ in range(cell_count(50))]
         polygons, dots, colors = make_polygons_and_dots(
                 cells, bounds, THEME1, theme_func_gradient)
 
         for polygon in polygons:
             polygon.set_stroke(opacity=0)
 
-        neighbors = [[] for _ in range(len(cells))]
-        for i in range(len(cells)):
-            for j in range(len(cells)):
-                if i == j:
-                    continue
-
-                if is_neighbor(bounds, cells, i, j):
-                    neighbors[i].append(j)
+        neighbors = get_neighbors(bounds, cells)
 
         intersections = cells_intersections(bounds, cells, neighbors)
         vertices = VGroup(Dot((inter.pos.x, inter.pos.y, 0), color=FG, radius=.05)
@@ -357,31 +350,23 @@ We therefore conclude that the intersection point between $A$, $B$ and $C$, the
 
         dots = VGroup(Dot((u.x, u.y, 0), radius=.15, color=FG) for u in [A.pos, B.pos])
 
-        def updater(_):
-            y = h*.9 * (1-t.get_value()*.999)
+        def cells_updater(t):
+            y = h*.9 * (1-t*.999)
             cells[2].pos.y = y
             cells[3].pos.y = -y
 
-            for i, polygon in make_polygons(options, bounds, cells):
-                if i < 2:
-                    col = col1(t.get_value())
-                else:
-                    col = col2
-
-                polygons[i].set_points_as_corners([(u.x, u.y, 0) for u in polygon])
-                polygons[i].set_color(col)
-                polygons[i].set_stroke(color=FG)
-
-        t = ValueTracker(0)
-        dummy = [(-1, 0, 0), (1, 0, 0), (0, 1.41, 0)]
+        @dynamic
+        def style_polygon(i, polygon, t):
+            polygon.set_color(col1(t) if i < 2 else col2)
+            polygon.set_stroke(color=FG)
 
-        polygons = VGroup(Polygon(*dummy, fill_opacity=.5) for _ in range(4))
-        updater(None)
+        voronoi = DiagramAnimation(bounds, cells, style_polygon, fill_opacity=.5)
+        polygons = voronoi.polygons
+        cells_updater(0)
+        voronoi.update(0)
         self.play(FadeIn(polygons), Write(dots))
-        polygons.add_updater(updater)
 
-        self.play(t.animate.set_value(1), run_time=4)
-        polygons.clear_updaters()
+        voronoi.play(self, cells_updater, run_time=4)
 
         self.play(FadeOut(polygons), FadeOut(dots), run_time=.5)
         self.wait()
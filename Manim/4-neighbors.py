@@ -2,17 +2,17 @@ from manim import *
 
 from theme import *
 from utils import *
+from profiles import PreviewWaits, density
 
 from fast_voronoi import *
 from fast_voronoi.utils import perp_bisector, get_equidistant
-from fast_voronoi.polygons import make_polygons
 
-class Main(Scene):
+class Main(PreviewWaits, Scene):
     def construct(self):
         Text.set_default(color=FG, stroke_color=FG)
         self.camera.background_color = BG
 
-        options = Options(segments_density=10, divide_lines=True, complete_polygons=True)
+        options = Options(segments_density=density(10), divide_lines=True, complete_polygons=True)
         bounds = get_bounds(self.camera, 0)
         left, top, w, h = bounds.left, bounds.top, bounds.w, bounds.h
         bounds = Bounds(left*3, top*3, w*3, h*3)
@@ -82,6 +82,7 @@ class Main(Scene):
             polygon.set_color(FG)
             polygon.set_fill(opacity=0)
 
+        @dynamic
         def style_polygon_t_filled(i, polygon, t):
             polygon.set_fill(color=[COL1, COL2, COL3, COL3, COL3][i], opacity=.5*t)
             polygon.set_stroke(FG)
@@ -90,52 +91,12 @@ class Main(Scene):
             polygon.set_fill(color=[COL1, COL2, COL3, COL3, COL3][i], opacity=.5)
             polygon.set_stroke(FG)
 
-        def polygons_updater(_):
-            cells_updater(t.get_value())
+        voronoi = DiagramAnimation(bounds, cells, dots=dots, options=options)
+        polygons = voronoi.polygons
 
-            index = 0
-            for i, points_raw in make_polygons(options, bounds, cells):
-                points = [(u.x, u.y, 0) for u in points_raw]
+        def play_animation(cells_updater, style_polygon, **kwargs):
+            voronoi.play(self, cells_updater, style_polygon, **kwargs)
 
-                polygon = polygons[index]
-                polygon.set_points_as_corners(points)
-                polygon.set_opacity(1)
-                style_polygon(i, polygon, t.get_value())
-
-                index += 1
-
-            # hide the unused polygons
-            for i in range(index, len(polygons)):
-                polygons[i].set_opacity(0)
-
-        def dots_updater(_):
-            for cell, dot in zip(cells, dots):
-                u = cell.pos
-                dot.move_to((u.x, u.y, 0))
-
-        cells_updater = style_polygon = None
-        t = ValueTracker(0)
-
-        def play_animation(_cells_updater, _style_polygon, **kwargs):
-            nonlocal cells_updater, style_polygon
-            cells_updater = _cells_updater
-            style_polygon = _style_polygon
-
-            t.set_value(0)
-
-            dots.add_updater(dots_updater)
-            polygons.add_updater(polygons_updater)
-            self.play(t.animate.set_value(1), **kwargs)
-            dots.clear_updaters()
-            polygons.clear_updaters()
-
-            # make sure the last frame of the animation is played
-            t.set_value(1)
-            polygons_updater(None)
-            dots_updater(None)
-
-        dummy = [(-1, 0, 0), (1, 0, 0), (0, 1.41, 0)]
-        polygons = VGroup(Polygon(*dummy) for _ in range(len(cells)))
         self.add(polygons)
 
         play_animation(cells_updater1, style_polygon_wireframe, rate_func=linear, run_time=5)
@@ -185,9 +146,8 @@ class Main(Scene):
 
         for cell in cells:
             cell.pos *= .7
-        bounds = get_bounds(self.camera, 100)
-        cells_updater = lambda _: None
-        polygons_updater(None)
+        voronoi.bounds = get_bounds(self.camera, 100)
+        voronoi.update()
 
         self.play(everything.animate.scale(.1))
         self.wait()
@@ -195,8 +155,7 @@ class Main(Scene):
         self.wait()
 
         def bounds_updater(_):
-            nonlocal bounds
-            bounds = get_bounds(self.camera, .1 - t.get_value())
+            voronoi.bounds = get_bounds(self.camera, .1 - voronoi.t.get_value())
 
         polygons.add_updater(bounds_updater)
         play_animation(lambda _: None, style_polygon_filled, run_time=4)
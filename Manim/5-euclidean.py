@@ -2,12 +2,14 @@ from manim import *
 
 from theme import *
 from utils import *
+from profiles import PreviewWaits, cell_count
+from curves import SquigglyLine
 
 from fast_voronoi import *
 
 import numpy as np
 
-class Main(Scene):
+class Main(PreviewWaits, Scene):
     def construct(self):
         Text.set_default(color=FG, stroke_color=FG)
         self.camera.background_color = BG
@@ -70,16 +72,6 @@ class Main(Scene):
                   equation.animate.shift(8*RIGHT))
         self.wait()
 
-    def squiggly_line(self, a, b):
-        f = lambda t: np.reshape((t, np.sin(2*np.pi*t)*.2, 0), (3, 1))
-        u = b-a
-        start = np.reshape(a, (3, 1))
-        mat = np.matrix([[u[0], -u[1], 0],
-                         [u[1],  u[0], 0],
-                         [0,     0,    1]])
-
-        return [np.array((mat*f(t) + start).T)[0] for t in np.arange(0, 1+1e-6, .01)]
-
     def second_scene(self):
         a, b = np.array([-2, -1, 0]), np.array([2, 2, 0])
         c = np.array([b[0], a[1], 0])
@@ -142,10 +134,7 @@ class Main(Scene):
         self.play(FadeOut(triangle[1:], s))
         self.wait()
 
-        points = self.squiggly_line(a, b)
-
-        weird_line = VMobject(color=COL3, stroke_width=8)
-        weird_line.set_points_as_corners(points)
+        weird_line = SquigglyLine(a, b, color=COL3, stroke_width=8)
         self.play(ReplacementTransform(triangle[0], weird_line))
         self.wait(.5)
         straight_line = Line(a, b, color=COL3, stroke_width=8)
@@ -252,7 +241,7 @@ two points\"""", color=FG, font='Z003', font_size=48).shift(3*LEFT)
 
         np.random.seed(0)
         cells = [Cell(v2(np.random.random()*w+left, np.random.random()*h+top),
-                      np.random.random()*3 + 2) for _ in range(100)]
+                      np.random.random()*3 + 2) for _ in range(cell_count(100))]
 
         polygons, _, _ = make_polygons_and_dots(
                 cells, bounds, THEME2, theme_func_gradient)
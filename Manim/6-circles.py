@@ -2,16 +2,17 @@ from manim import *
 
 from theme import *
 from utils import *
+from profiles import PreviewWaits, cell_count
+from curves import ArcCurve
 from texx import *
 
 import numpy as np
 
 from fast_voronoi import *
-from fast_voronoi.neighbors import is_neighbor
 from fast_voronoi.intersections import cells_intersections
 from fast_voronoi.polygons import make_polygons
 
-class Main(Scene):
+class Main(PreviewWaits, Scene):
     def construct(self):
         Text.set_default(color=FG, stroke_color=FG)
         self.camera.background_color = BG
@@ -27,13 +28,7 @@ class Main(Scene):
         segments = 100
 
         def circle_updater(_):
-            angle = t.get_value()*2*np.pi
-
-            if angle:
-                points = [center + (np.cos(angle*t/segments)*radius,
-                                    np.sin(angle*t/segments)*radius, 0)
-                          for t in range(segments+1)]
-                circle.set_points_as_corners(points)
+            circle.set_angle(t.get_value()*2*np.pi)
 
         def sticks_updater(_):
             angle = t.get_value()*2*np.pi
@@ -44,7 +39,7 @@ class Main(Scene):
 
         sticks.add_updater(sticks_updater)
         if draw_circle:
-            circle = VMobject(color=FG)
+            circle = ArcCurve(center, radius, angle=0, n=segments, color=FG)
             circle.add_updater(circle_updater)
             self.add(circle)
 
@@ -441,21 +436,14 @@ class Main(Scene):
         cells = [Cell(v2(np.random.uniform(bounds.left+1, bounds.right-1),
                          np.random.uniform(bounds.top+1, bounds.bottom-1)),
                       np.random.uniform()*3+2)
-                 for _ in range(50)]
+                 for _ in range(cell_count(50))]
         polygons, dots, _ = make_polygons_and_dots(
                 cells, bounds, THEME1, theme_func_gradient)
 
         for polygon in polygons:
             polygon.set_stroke(opacity=0)
 
-        neighbors = [[] for _ in range(len(cells))]
-        for i in range(len(cells)):
-            for j in range(len(cells)):
-                if i == j:
-                    continue
-
-                if is_neighbor(bounds, cells, i, j):
-                    neighbors[i].append(j)
+        neighbors = get_neighbors(bounds, cells)
 
         intersections = cells_intersections(bounds, cells, neighbors)
         vertices = VGroup(Dot((inter.pos.x, inter.pos.y, 0), color=FG, radius=.05)
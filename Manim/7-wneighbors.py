@@ -2,18 +2,19 @@ from manim import *
 
 from theme import *
 from utils import *
+from profiles import PreviewWaits, density
 
 from fast_voronoi import *
 from fast_voronoi.utils import get_circle, circle_inter
 
 import numpy as np
 
-class Main(Scene):
+class Main(PreviewWaits, Scene):
     def construct(self):
         Text.set_default(color=FG, stroke_color=FG)
         self.camera.background_color = BG
 
-        options = Options(segments_density=10, divide_lines=True, complete_polygons=True)
+        options = Options(segments_density=density(10), divide_lines=True, complete_polygons=True)
         bounds = get_bounds(self.camera, 1)
         left, top, w, h = bounds.left, bounds.top, bounds.w, bounds.h
         bounds = Bounds(left*3, top*3, w*3, h*3)
@@ -44,53 +45,18 @@ class Main(Scene):
             cells[2].pos.y = h*.3 + t*h*1.2
             cells[3].pos.y = -h*.3 - t*h*1.2
 
-        def polygons_updater(_):
-            cells_updater(t.get_value())
+        def style_polygon(_, polygon, __):
+            polygon.set_fill(opacity=.5)
 
-            index = 0
-            for i, points_raw in make_polygons(options, bounds, cells):
-                points = [(u.x, u.y, 0) for u in points_raw]
+        voronoi = DiagramAnimation(bounds, cells, style_polygon, dots=dots, options=options,
+                                   fill_opacity=.5, stroke_color=FG)
+        polygons = voronoi.polygons
 
-                polygon = polygons[index]
-                polygon.set_points_as_corners(points)
+        def play_animation(cells_updater, **kwargs):
+            voronoi.play(self, cells_updater, **kwargs)
 
-                index += 1
-
-            # hide the unused polygons
-            for i, polygon in enumerate(polygons):
-                polygon.set_stroke(opacity=i < index)
-
-        cells_updater = None
-        t = ValueTracker(0)
-
-        def play_animation(_cells_updater, **kwargs):
-            nonlocal cells_updater
-            cells_updater = _cells_updater
-
-            t.set_value(0)
-
-            dots.add_updater(dots_updater)
-            polygons.add_updater(polygons_updater)
-            self.play(t.animate.set_value(1), **kwargs)
-            dots.clear_updaters()
-            polygons.clear_updaters()
-
-            # make sure the last frame of the animation is played
-            t.set_value(1)
-            polygons_updater(None)
-            dots_updater(None)
-
-        def dots_updater(_):
-            for cell, dot in zip(cells, dots):
-                u = cell.pos
-                dot.move_to((u.x, u.y, 0))
-
-        dummy = [(-1, 0, 0), (1, 0, 0), (0, 1.41, 0)]
-        buffer = 5
-        polygons = VGroup(Polygon(*dummy, fill_opacity=.5, stroke_color=FG)
-                          for _ in range(len(cells)+buffer))
-        cells_updater = cells_updater1
-        polygons_updater(None)
+        cells_updater1(0)
+        voronoi.update()
 
         self.play(Write(dots), FadeIn(polygons))
         self.add(circle)
@@ -99,9 +65,8 @@ class Main(Scene):
         play_animation(cells_updater1, rate_func=linear, run_time=5)
         self.wait()
 
+        # ends back on t = 0, which is the last frame played
         play_animation(cells_updater2, rate_func=there_and_back, run_time=5)
-        t.set_value(0)
-        polygons_updater(None)
         self.wait()
 
         play_animation(cells_updater3, run_time=.5)
@@ -4,6 +4,9 @@ from manim import *
 
 from theme import *
 from utils import *
+from profiles import PreviewWaits, cell_count, density
+from timeline import bake, frame_values
+from curves import ArcCurve
 
 from fast_voronoi import *
 from fast_voronoi.utils import get_circle, circle_inter
@@ -51,7 +54,7 @@ def get_edges(options, bounds, cells, m):
 
     return sum(edges, start=[])
 
-class Main(Scene):
+class Main(PreviewWaits, Scene):
     def construct(self):
         Text.set_default(color=FG, stroke_color=FG)
         self.camera.background_color = BG
@@ -135,43 +138,22 @@ class Main(Scene):
                                  lag_ratio=1), run_time=.7*len(polygon))
         self.wait()
 
-        # add dummy polygon to compensate for a polygon being broken in half
-        dummy = [(-1, 0, 0), (1, 0, 0), (0, 1.41, 0)]
-        for _ in range(4):
-            polygons_mo += Polygon(*dummy, fill_opacity=0, stroke_color=FG)
-
         weights = np.random.rand(len(cells))*3 + 2
         weights[-1] = 3.1
-        def polygons_updater(_):
-            # update cells
-            t_ = t.get_value()
+        def cells_updater(t_):
             for cell, weight in zip(cells, weights):
                 cell.weight = 1 + (weight-1)*t_
 
-            index = 0
-            for i, points_raw in make_polygons(options, bounds, cells):
-                points = [(u.x, u.y, 0) for u in points_raw]
-
-                polygon = polygons_mo[index]
-                polygon.set_points_as_corners(points)
-
-                index += 1
-
-            # hide the unused polygons
-            for i, polygon in enumerate(polygons_mo):
-                polygon.set_stroke(opacity=i < index)
+        voronoi = DiagramAnimation(bounds, cells, polygons=polygons_mo)
 
         self.play(polygon.animate.shift(center))
 
-        t = ValueTracker(0)
-        polygons_updater(None)
+        cells_updater(0)
+        voronoi.update()
         self.play(FadeIn(polygons_mo))
         self.remove(polygon)
 
-        polygons_mo.add_updater(polygons_updater)
-        self.play(t.animate.set_value(1), run_time=2)
-        polygons_updater(None)
-        polygons_mo.clear_updaters()
+        voronoi.play(self, cells_updater, run_time=2)
         self.wait()
 
         edges = get_edges(options, bounds, cells, 4)
@@ -278,10 +260,10 @@ class Main(Scene):
         bounds = get_bounds(self.camera, 1)
         left, top, w, h = bounds.left, bounds.top, bounds.w, bounds.h
 
-        options = Options(segments_density=10, divide_lines=False)
+        options = Options(segments_density=density(10), divide_lines=False)
         bounds = Bounds(left*3, top*3, w*3, h*3)
         np.random.seed(0)
-        cells = [Cell(v2(0, 0), 1) for _ in range(30)]
+        cells = [Cell(v2(0, 0), 1) for _ in range(cell_count(30))]
 
         mkpos = lambda: [v2(np.random.random()*w+left, np.random.random()*h+top)
                          for _ in range(len(cells))]
@@ -289,57 +271,35 @@ class Main(Scene):
         start_pos, end_pos = mkpos(), mkpos()
         weights1, weights2 = mkw(), mkw()
 
-        dummy = [(-1, 0, 0), (1, 0, 0), (0, 1.41, 0)]
-        polygons_mo = VGroup(Polygon(*dummy, fill_opacity=1, stroke_color=FG)
-                             for _ in range(len(cells)+10))
-
-        def polygons_updater(_):
-            # update cells
-            t_ = t.get_value()
+        def cells_updater(t_):
             for cell, start, end, w1, w2 in zip(cells, start_pos, end_pos, weights1, weights2):
                 cell.pos = start + (end-start)*t_
                 cell.weight = w1 + (w2-w1)*t_
 
-            index = 0
-            for i, points_raw in make_polygons(options, bounds, cells):
-                points = [(u.x, u.y, 0) for u in points_raw]
+        # the geometry of all the frames is computed ahead, in parallel
+        run_time = 30
+        timeline = bake(options, bounds, cells, cells_updater,
+                        frame_values(run_time, linear), tolerance=pixel_size()/2)
 
-                polygon = polygons_mo[index]
-                polygon.set_points_as_corners(points)
-                color = get_color_from_t(THEME1, theme_func_gradient(bounds, cells[i]))
-                polygon.set_fill(color)
+        @dynamic
+        def style_polygon(i, polygon, _):
+            polygon.set_fill(get_color_from_t(THEME1, theme_func_gradient(bounds, cells[i])))
 
-                index += 1
+        voronoi = DiagramAnimation(bounds, cells, style_polygon, diagrams=timeline.frame,
+                                   fill_opacity=1, stroke_color=FG)
+        self.add(voronoi.polygons)
 
-            # hide the unused polygons
-            for i, polygon in enumerate(polygons_mo):
-                polygons_mo[i].set_opacity(i < index)
-
-        self.add(polygons_mo)
-
-        t = ValueTracker(0)
-        polygons_mo.add_updater(polygons_updater)
-        self.play(t.animate.set_value(1), rate_func=linear, run_time=30)
-        polygons_mo.clear_updaters()
+        voronoi.play(self, cells_updater, rate_func=linear, run_time=run_time)
 
     def fourth_scene(self):
         A = Dot(color=COL1).shift(2*LEFT).set_z_index(1)
         B = Dot(color=COL1).shift(2*RIGHT).set_z_index(1)
 
-        def make_arc(n):
-            points = []
-            for i in range(0, n+1):
-                angle = np.pi - np.pi*i/n
-                points.append((np.cos(angle)*2, np.sin(angle)*2, 0))
-
-            arc.set_points_as_corners(points)
-
         def updater(_):
-            make_arc(round(t.get_value()))
+            arc.redraw(round(t.get_value()))
 
         line = Line(A, B)
-        arc = VMobject(color=FG)
-        make_arc(50)
+        arc = ArcCurve(radius=2, start_angle=np.pi, angle=-np.pi, n=50, color=FG)
 
         self.wait()
         self.play(Write(A), Write(B))
@@ -350,7 +310,7 @@ class Main(Scene):
 
         self.play(FadeOut(arc))
         t = ValueTracker(1)
-        make_arc(1)
+        arc.redraw(1)
         self.play(FadeIn(arc))
         self.wait()
 
@@ -0,0 +1,130 @@
+"""timings of the geometry calls the scenes depend on
+
+Layouts are made the same way as in the scenes: np.random.seed(0), sites
+uniform inside get_bounds(camera, 1) minus a margin of 1, each followed by
+its weight drawn as uniform*3+2 for the weighted runs. Every call is
+repeated until either --repeat runs or --budget seconds, and the
+percentiles of the durations are written as JSON, to compare engine changes
+before a long render. Every operation is timed at every size, use --sizes
+or --ops to narrow a run down.
+
+    python bench.py --sizes 10 50 100 1000 --output bench.json"""
+
+import sys
+import json
+import time
+import argparse
+import platform
+import importlib
+from types import SimpleNamespace
+
+import numpy as np
+from manim import config
+
+from fast_voronoi import Cell, v2
+from fast_voronoi.intersections import cells_intersections
+
+from theme import THEME1, theme_func_gradient
+from utils import get_bounds, make_polygons_and_dots, get_neighbors, add_polygons_margin, options
+
+SIZES = (10, 50, 100, 1000, 10000)
+PERCENTILES = (50, 90, 99)
+
+def make_layout(n, weighted):
+    camera = SimpleNamespace(frame_center=np.zeros(3), frame_width=config.frame_width,
+                             frame_height=config.frame_height)
+    bounds = get_bounds(camera, 1)
+
+    np.random.seed(0)
+    cells = []
+    for _ in range(n):
+        cell = Cell(v2(np.random.uniform(bounds.left+1, bounds.right-1),
+                       np.random.uniform(bounds.top+1, bounds.bottom-1)))
+        if weighted:
+            cell.weight = np.random.uniform()*3+2
+        cells.append(cell)
+
+    return bounds, cells
+
+def get_ops():
+    """name -> function(bounds, cells) returning the timed call, so that the
+    setup of each run is not timed"""
+
+    wedges = importlib.import_module('8-wedges')
+
+    def polygons(bounds, cells):
+        return lambda: make_polygons_and_dots(cells, bounds, THEME1, theme_func_gradient)
+
+    def neighbors(bounds, cells):
+        return lambda: get_neighbors(bounds, cells)
+
+    def intersections(bounds, cells):
+        neighbors = get_neighbors(bounds, cells)
+        return lambda: cells_intersections(bounds, cells, neighbors)
+
+    def edges(bounds, cells):
+        # the cell closest to the center, like the one shown in 8-wedges
+        m = min(range(len(cells)), key=lambda i: cells[i].pos.length())
+        return lambda: wedges.get_edges(options, bounds, cells, m)
+
+    def margin(bounds, cells):
+        polygons, dots, _ = make_polygons_and_dots(cells, bounds, THEME1, theme_func_gradient)
+        return lambda: add_polygons_margin(dots, polygons, .05)
+
+    return {'make_polygons_and_dots': polygons, 'get_neighbors': neighbors,
+            'cells_intersections': intersections, 'get_edges': edges,
+            'add_polygons_margin': margin}
+
+def measure(setup, bounds, cells, repeat, budget):
+    times = []
+    start = time.perf_counter()
+    while len(times) < repeat and (not times or time.perf_counter()-start < budget):
+        call = setup(bounds, cells)
+        t = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - t)
+
+    times = np.array(times)
+    summary = {f'p{p}': float(np.percentile(times, p)) for p in PERCENTILES}
+    summary.update(min=float(times.min()), max=float(times.max()),
+                   mean=float(times.mean()), runs=len(times))
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--ops', nargs='+', help='subset of the operations to time')
+    parser.add_argument('--repeat', type=int, default=20, help='max runs per measure')
+    parser.add_argument('--budget', type=float, default=10,
+                        help='seconds after which a measure stops repeating')
+    parser.add_argument('--unweighted', action='store_true', help='skip the weighted layouts')
+    parser.add_argument('--output', help='JSON file, stdout by default')
+    args = parser.parse_args(argv)
+
+    ops = get_ops()
+    names = args.ops or list(ops)
+    unknown = set(names) - set(ops)
+    if unknown:
+        parser.error(f'unknown operations: {", ".join(sorted(unknown))}')
+
+    results = []
+    for weighted in (False,) if args.unweighted else (False, True):
+        for n in args.sizes:
+            bounds, cells = make_layout(n, weighted)
+            for name in names:
+                summary = measure(ops[name], bounds, cells, args.repeat, args.budget)
+                results.append({'op': name, 'n': n, 'weighted': weighted, 'seconds': summary})
+                print(f'{name:>24} n={n:<6} {"weighted" if weighted else "":>8} '
+                      f'p50 {summary["p50"]*1e3:10.2f} ms', file=sys.stderr)
+
+    report = {'python': platform.python_version(), 'numpy': np.__version__,
+              'machine': platform.machine(), 'repeat': args.repeat,
+              'budget': args.budget, 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+if __name__ == '__main__':
+    main()
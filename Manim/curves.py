@@ -0,0 +1,108 @@
+"""curves drawn from a function of the samples of [0, 1]
+
+A curve evaluates all of its corners in one vectorized call over the cached
+samples s = 0, 1/n, ..., 1 and writes them in place in its points (see
+set_corners), so that updaters redrawing a curve on every frame cost a few
+array operations instead of a Python loop over the points."""
+
+from functools import lru_cache
+
+import numpy as np
+from manim import VMobject, ORIGIN, TAU
+
+from utils import set_corners
+
+def _frozen(array):
+    array.flags.writeable = False
+    return array
+
+@lru_cache(maxsize=None)
+def unit_samples(n):
+    """(n+1,) samples of [0, 1], shared and read-only"""
+    return _frozen(np.linspace(0, 1, n+1))
+
+@lru_cache(maxsize=256)
+def unit_arcs(n, angle=TAU):
+    """(n+1, 2) points of the unit arc from 0 sweeping angle, shared and
+    read-only, the arcs of the last 256 (n, angle) being kept"""
+
+    s = unit_samples(n)
+    return _frozen(np.column_stack((np.cos(angle*s), np.sin(angle*s))))
+
+def unit_arc(n, start_angle, angle):
+    """(n+1, 2) points of the unit arc from start_angle sweeping angle: the
+    cached arc sweeping angle (see unit_arcs), rotated to start_angle, so
+    that arcs swept by an updater hit the cache for every angle they return
+    to, whatever their start"""
+
+    arc = unit_arcs(n, float(angle))
+    if not start_angle:
+        return arc
+
+    c, d = np.cos(start_angle), np.sin(start_angle)
+    return arc @ np.array(((c, d), (-d, c)))
+
+class Curve(VMobject):
+    """polyline through the corners f(s), f taking the (n+1,) samples and
+    returning (n+1, 2) or (n+1, 3) points"""
+
+    def __init__(self, f=None, n=100, **kwargs):
+        super().__init__(**kwargs)
+        self.f, self.n = f, n
+        if f is not None:
+            self.redraw()
+
+    def corners(self, s):
+        return self.f(s)
+
+    def redraw(self, n=None):
+        """evaluate the curve again, with n segments if given"""
+
+        self.n = n or self.n
+        corners = np.asarray(self.corners(unit_samples(self.n)), dtype=float)
+        if corners.shape[1] == 2:
+            corners = np.column_stack((corners, np.zeros(len(corners))))
+        return set_corners(self, corners)
+
+class ArcCurve(Curve):
+    """arc of a circle from start_angle sweeping angle, e.g. drawn
+    progressively by updating angle, or with fewer segments by updating n"""
+
+    def __init__(self, center=ORIGIN, radius=1, start_angle=0, angle=TAU, n=100, **kwargs):
+        self.center = np.asarray(center, dtype=float)
+        self.radius, self.start_angle, self.angle = radius, start_angle, angle
+        super().__init__(n=n, **kwargs)
+        self.redraw()
+
+    def corners(self, s):
+        points = np.empty((len(s), 3))
+        points[:, :2] = self.center[:2] + self.radius*unit_arc(self.n, self.start_angle, self.angle)
+        points[:, 2] = self.center[2]
+        return points
+
+    def redraw(self, n=None):
+        # nothing to draw before the arc starts sweeping
+        if not self.angle:
+            self.n = n or self.n
+            return self.clear_points()
+        return super().redraw(n)
+
+    def set_angle(self, angle, n=None):
+        self.angle = angle
+        return self.redraw(n)
+
+class SquigglyLine(Curve):
+    """segment from a to b displaced by a sine across it, amplitude being
+    relative to the length of the segment"""
+
+    def __init__(self, a, b, amplitude=.2, periods=1, n=100, **kwargs):
+        self.a, self.b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+        self.amplitude, self.periods = amplitude, periods
+        super().__init__(n=n, **kwargs)
+        self.redraw()
+
+    def corners(self, s):
+        u = self.b - self.a
+        across = np.array((-u[1], u[0], 0))
+        wave = self.amplitude * np.sin(TAU*self.periods*s)
+        return self.a + s[:, None]*u + wave[:, None]*across
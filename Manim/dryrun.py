@@ -0,0 +1,122 @@
+"""headless run of the scenes of a chapter, to time their geometry
+
+construct() and every play run at the frame rate of the render, with all the
+updaters and style functions, but the camera never captures the mobjects and
+no video is written: only the Python side of the scene is timed. The compute
+time of every animation is printed along with the line of the chapter that
+played it, and --trace also times every updater (see timing.py).
+
+    python dryrun.py 8-wedges --frame-rate 60 --top 10 --trace trace.json"""
+
+import os
+import sys
+import json
+import time
+import inspect
+import argparse
+import linecache
+import importlib
+
+from manim import config, Scene
+
+from timing import UpdaterTimer
+
+def scene_classes(module):
+    """Scene subclasses defined in module, in source order"""
+
+    classes = [cls for _, cls in inspect.getmembers(module, inspect.isclass)
+               if issubclass(cls, Scene) and cls.__module__ == module.__name__]
+    return sorted(classes, key=lambda cls: inspect.getsourcelines(cls)[1])
+
+def caller(filename):
+    """'line: source' of the innermost frame running the file filename"""
+
+    frame = sys._getframe(1)
+    while frame is not None and os.path.abspath(frame.f_code.co_filename) != filename:
+        frame = frame.f_back
+    if frame is None:
+        return '?'
+    return f'{frame.f_lineno}: {linecache.getline(filename, frame.f_lineno).strip()}'
+
+def dry(scene_cls, records):
+    """subclass of scene_cls that does not draw, appending a record to records
+    for every play"""
+
+    filename = os.path.abspath(inspect.getsourcefile(scene_cls))
+
+    class DryRun(scene_cls):
+        def setup(self):
+            super().setup()
+            self.skip_animation_preview = True
+            self.renderer.update_frame = lambda *args, **kwargs: None
+
+        def play(self, *args, **kwargs):
+            where = caller(filename)
+            start = time.perf_counter()
+            super().play(*args, **kwargs)
+            seconds = time.perf_counter() - start
+
+            frames = max(round(self.duration * config.frame_rate), 1)
+            records.append({'scene': scene_cls.__name__, 'play': len(records), 'where': where,
+                            'run_time': self.duration, 'frames': frames, 'seconds': seconds})
+
+    DryRun.__name__ = DryRun.__qualname__ = scene_cls.__name__
+    return DryRun
+
+def run(scene_cls):
+    records = []
+    start = time.perf_counter()
+    dry(scene_cls, records)().render()
+    return records, time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('module', help='chapter to run, e.g. 0-intro')
+    parser.add_argument('scenes', nargs='*', help='scenes to run, all of them by default')
+    parser.add_argument('--frame-rate', type=float, help='frame rate of the render')
+    parser.add_argument('--top', type=int, help='only print the slowest animations')
+    parser.add_argument('--output', help='also write the records as JSON')
+    parser.add_argument('--trace', help='time the updaters, and write a chrome trace')
+    args = parser.parse_args(argv)
+
+    config.dry_run = True
+    config.disable_caching = True
+    if args.frame_rate:
+        config.frame_rate = args.frame_rate
+
+    module = importlib.import_module(args.module.removesuffix('.py'))
+    classes = {cls.__name__: cls for cls in scene_classes(module)}
+    unknown = set(args.scenes) - set(classes)
+    if unknown:
+        parser.error(f'unknown scenes: {", ".join(sorted(unknown))}')
+
+    timer = UpdaterTimer()
+    if args.trace:
+        timer.install()
+
+    report = []
+    for name in args.scenes or list(classes):
+        records, total = run(classes[name])
+        report.append({'scene': name, 'seconds': total, 'plays': records})
+
+        shown = records
+        if args.top:
+            shown = sorted(records, key=lambda r: r['seconds'])[-args.top:]
+        print(f'{name}: {len(records)} animations, {total:.2f} s '
+              f'({total - sum(r["seconds"] for r in records):.2f} s outside of them)')
+        for r in shown:
+            print(f'{r["play"]:>5} {r["seconds"]:8.3f} s {r["frames"]:>5} frames '
+                  f'{r["seconds"] / r["frames"] * 1e3:8.2f} ms/frame  {r["where"]}')
+
+    if args.trace:
+        timer.uninstall()
+        print(timer.summary(args.top))
+        timer.write_trace(args.trace)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'module': args.module, 'frame_rate': config.frame_rate,
+                       'scenes': report}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""grids of cells filled by a single animation
+
+A PixelGrid is a grid of cells held by one (N, 4) rgba array and drawn as a
+single image, with optional gridlines on top, instead of a VGroup of
+squares: only the pixels of the cells that changed are written.
+
+A GridWave plays the fill changes of every cell of a grid at once, from
+arrays: cell k goes through the same (colors, opacity) steps, starting at
+starts[k] and lasting durations[k] seconds, like the Successions of
+set_fill of a lagged AnimationGroup would, but every frame is one array
+interpolation and only the cells that changed are written.
+
+    screen = PixelGrid((-3, -3), (3, 3), (30, 30), stroke_color=GRAY_D)
+    GridWave(screen, *lag_schedule(900, .001, run_time=2),
+             (color_table(colors), 1), (None, 0))"""
+
+import numpy as np
+from manim import Animation, Mobject, Group, VGroup, ImageMobject, Line, RESAMPLING_ALGORITHMS, \
+        WHITE, linear, smooth
+
+from utils import color_table
+
+class PixelGrid(Group):
+    """grid of nx by ny cells covering the box from low to high, cell k being
+    column k // ny and row k % ny from the bottom (x first, like
+    grid_centers and rasterize). rgbas holds the (N, 4) fills of the cells,
+    change them with set_fill or a GridWave to update the image. Gridlines
+    of stroke_color are drawn if given, as the lines VGroup."""
+
+    def __init__(self, low, high, shape, color=WHITE, opacity=0, stroke_color=None,
+                 stroke_width=1, **kwargs):
+        super().__init__(**kwargs)
+        (x0, y0), (x1, y1) = low, high
+        self.low, self.high, self.shape = np.array(low), np.array(high), shape
+        nx, ny = shape
+
+        self.rgbas = np.zeros((nx*ny, 4))
+        self.rgbas[:] = color_table([color], opacity)
+        self.image = ImageMobject(np.zeros((ny, nx, 4), dtype=np.uint8)) \
+                .set_resampling_algorithm(RESAMPLING_ALGORITHMS['nearest'])
+        self.image.stretch_to_fit_width(x1-x0).stretch_to_fit_height(y1-y0) \
+                .move_to(((x0+x1)/2, (y0+y1)/2, 0))
+        self.set_rgbas(self.rgbas)
+        self.add(self.image)
+
+        self.lines = VGroup()
+        if stroke_color is not None:
+            self.lines.add(*(Line((x, y0, 0), (x, y1, 0)) for x in np.linspace(x0, x1, nx+1)),
+                           *(Line((x0, y, 0), (x1, y, 0)) for y in np.linspace(y0, y1, ny+1)))
+            self.lines.set_stroke(stroke_color, width=stroke_width)
+            self.add(self.lines)
+
+    def cell_center(self, k):
+        nx, ny = self.shape
+        size = (self.high - self.low) / (nx, ny)
+        x, y = self.low + size*(np.array(divmod(k, ny)) + .5)
+        return np.array((x, y, 0))
+
+    def set_rgbas(self, rgbas, cells=None):
+        """set the fills of cells (all of them by default) and their pixels"""
+
+        cells = np.arange(len(self.rgbas)) if cells is None else np.asarray(cells)
+        self.rgbas[cells] = rgbas
+
+        # image rows go down from the top
+        ny = self.shape[1]
+        rows, columns = ny-1 - cells % ny, cells // ny
+        pixels = np.round(self.rgbas[cells]*255).astype(np.uint8)
+        self.image.pixel_array[rows, columns] = pixels
+        self.image.orig_alpha_pixel_array[rows, columns] = pixels[:, 3]
+        return self
+
+    def set_fill(self, color=None, opacity=None, cells=None):
+        """like VMobject.set_fill for cells (all of them by default), color
+        being a single color or an (N, 3) color_table of the cells"""
+
+        rgbas = self.rgbas[slice(None) if cells is None else cells].copy()
+        if color is not None:
+            rgbas[:, :3] = color if isinstance(color, np.ndarray) else color_table([color])
+        if opacity is not None:
+            rgbas[:, 3] = opacity
+        return self.set_rgbas(rgbas, cells)
+
+def lag_schedule(n, lag_ratio, run_time=1):
+    """start times and durations of n animations of run_time played by an
+    AnimationGroup with lag_ratio"""
+    return np.arange(n)*lag_ratio*run_time, np.full(n, float(run_time))
+
+def grouped_schedule(labels, lag_ratio, group_lag_ratio, run_time=1):
+    """start times and durations of the cells played group by group of equal
+    labels, in increasing label order, like an AnimationGroup with
+    group_lag_ratio of AnimationGroups with lag_ratio"""
+
+    labels = np.asarray(labels)
+    starts, offset = np.empty(len(labels)), 0
+    for label in np.unique(labels):
+        members = np.flatnonzero(labels == label)
+        times, _ = lag_schedule(len(members), lag_ratio, run_time)
+        starts[members] = offset + times
+        offset += group_lag_ratio*(times[-1] + run_time)
+    return starts, np.full(len(labels), float(run_time))
+
+def vectorized(rate_func):
+    """rate_func working on arrays, element by element if it does not"""
+
+    try:
+        rate_func(np.linspace(0, 1, 3))
+        return rate_func
+    except (TypeError, ValueError):
+        return np.vectorize(rate_func, otypes=[float])
+
+class GridWave(Animation):
+    """animation of the fill of the cells of grid, a PixelGrid or a group of
+    mobjects, or of its cells only if given
+
+    steps are (colors, opacity) pairs, colors being an (N, 3) color_table, a
+    single color or None to keep the color, opacity a number, an (N,) array
+    or None. Each step takes the same share of the duration of a cell and is
+    eased by cell_rate_func, the run time defaults to the end of the last
+    cell, and rate_func (linear by default) maps the time of the whole
+    animation like the one of an AnimationGroup."""
+
+    def __init__(self, grid, starts, durations, *steps, cells=None, cell_rate_func=smooth,
+                 rate_func=linear, **kwargs):
+        self.cells = np.arange(len(starts)) if cells is None else np.asarray(cells)
+        starts = np.asarray(starts, dtype=float)
+        durations = np.maximum(np.asarray(durations, dtype=float), 1e-9)
+        total = (starts + durations).max()
+        kwargs.setdefault('run_time', total)
+        super().__init__(grid, rate_func=rate_func, **kwargs)
+
+        self.starts, self.durations = starts/total, durations/total
+        self.steps = [(colors if colors is None or isinstance(colors, np.ndarray)
+                       else color_table([colors]), opacity) for colors, opacity in steps]
+        self.cell_rate_func = vectorized(cell_rate_func)
+
+    def create_starting_mobject(self):
+        # the starting fills are kept in self.frames, no need to copy the grid
+        return Mobject()
+
+    def begin(self):
+        if isinstance(self.mobject, PixelGrid):
+            current = self.mobject.rgbas[self.cells]
+        else:
+            current = np.array([self.mobject[k].get_fill_rgbas()[0] for k in self.cells])
+        frames = [current]
+        for colors, opacity in self.steps:
+            frame = frames[-1].copy()
+            if colors is not None:
+                frame[:, :3] = colors
+            if opacity is not None:
+                frame[:, 3] = opacity
+            frames.append(frame)
+
+        # (steps+1, N, 4) fills of the cells before and after every step
+        self.frames = np.stack(frames)
+        self.current = current.copy()
+        super().begin()
+
+    def interpolate_mobject(self, alpha):
+        steps, n = len(self.steps), len(self.current)
+        if not steps:
+            return
+
+        local = np.clip((alpha - self.starts) / self.durations, 0, 1) * steps
+        step = np.minimum(local.astype(int), steps-1)
+        t = local - step
+        moving = (t > 0) & (t < 1)
+        t[moving] = self.cell_rate_func(t[moving])
+
+        cells = np.arange(n)
+        before, after = self.frames[step, cells], self.frames[step+1, cells]
+        rgbas = before + t[:, None]*(after - before)
+
+        changed = np.flatnonzero((rgbas != self.current).any(axis=1))
+        if isinstance(self.mobject, PixelGrid):
+            self.mobject.set_rgbas(rgbas[changed], self.cells[changed])
+        else:
+            for k in changed:
+                self.mobject[self.cells[k]].fill_rgbas[:] = rgbas[k]
+        self.current[changed] = rgbas[changed]
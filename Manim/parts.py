@@ -0,0 +1,191 @@
+"""render a chapter one sub-scene at a time, reusing the unchanged ones
+
+The construct of a chapter is cut into parts at its self.clear() calls, a
+part being the sub-scene methods (first_scene, second_scene...) called in
+between. Every part is rendered on its own, with the other sub-scenes turned
+into no-ops, and its movie is cached under a hash of:
+    - the source of the chapter without the sub-scenes of the other parts
+      (its own methods, construct, the helpers and top-level code),
+    - the source of the local modules it imports (theme, utils, texx...),
+    - the quality of the render and the profile (see profiles.py).
+Only the parts whose hash changed are rendered, in parallel, then all of
+them are joined by ffmpeg. Constructs doing more than calling sub-scenes
+and clearing are a single part.
+
+Parts are expected to seed their own randomness, np.random and random are
+seeded with 0 before each of them.
+
+    python parts.py 3-points -q h"""
+
+import os
+import ast
+import sys
+import random
+import shutil
+import inspect
+import hashlib
+import argparse
+import textwrap
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import manim
+from manim import config
+
+from dryrun import scene_classes
+from profiles import PROFILE
+from slices import QUALITIES, concat
+
+def split(scene_cls):
+    """lists of the sub-scene methods of the parts of construct, a single
+    empty list if it cannot be split"""
+
+    tree = ast.parse(textwrap.dedent(inspect.getsource(scene_cls.construct)))
+    parts, current, started = [], [], False
+    for statement in tree.body[0].body:
+        call = statement.value if isinstance(statement, ast.Expr) else None
+        if (isinstance(call, ast.Call) and not call.args and isinstance(call.func, ast.Attribute)
+                and isinstance(call.func.value, ast.Name) and call.func.value.id == 'self'):
+            if call.func.attr == 'clear':
+                parts.append(current)
+                current = []
+                continue
+            if call.func.attr.endswith('_scene'):
+                current.append(call.func.attr)
+                started = True
+                continue
+        if started:
+            return [[]]
+
+    parts = [part for part in parts + [current] if part]
+    return parts or [[]]
+
+def local_sources(path, seen=None):
+    """sources of the module at path and of the modules of its folder it
+    imports, recursively, as a {name: source} dict"""
+
+    seen = {} if seen is None else seen
+    folder = os.path.dirname(path)
+    with open(path) as f:
+        seen[os.path.basename(path)] = source = f.read()
+
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            other = os.path.join(folder, name.split('.')[0] + '.py')
+            if os.path.basename(other) not in seen and os.path.exists(other):
+                local_sources(other, seen)
+
+    return seen
+
+def part_key(scene_cls, part, others):
+    path = inspect.getsourcefile(scene_cls)
+    sources = local_sources(path)
+
+    # the chapter without the sub-scenes of the other parts
+    chapter = sources.pop(os.path.basename(path))
+    for name in others:
+        chapter = chapter.replace(inspect.getsource(getattr(scene_cls, name)), '')
+
+    key = hashlib.sha1()
+    # the profile changes what the scenes render
+    key.update(repr((scene_cls.__name__, part, manim.__version__, config.pixel_width,
+                     config.pixel_height, config.frame_rate,
+                     sorted(vars(PROFILE).items()))).encode())
+    for name, source in [(None, chapter)] + sorted(sources.items()):
+        key.update(f'{name}\0{source}\0'.encode())
+    return key.hexdigest()
+
+def only(scene_cls, others):
+    """subclass of scene_cls whose sub-scenes others do nothing"""
+
+    class Part(scene_cls):
+        def setup(self):
+            super().setup()
+            for name in others:
+                setattr(self, name, lambda: None)
+
+    Part.__name__ = Part.__qualname__ = scene_cls.__name__
+    return Part
+
+def render_part(job):
+    module, name, others, settings, target = job
+    for key, value in settings.items():
+        config[key] = value
+    np.random.seed(0)
+    random.seed(0)
+
+    scene = only(getattr(importlib.import_module(module), name), others)()
+    scene.render()
+    shutil.move(scene.renderer.file_writer.movie_file_path, target)
+    return target
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('module', help='chapter to render, e.g. 3-points')
+    parser.add_argument('scene', nargs='?', help='scene class, the first one by default')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('-q', '--quality', choices=QUALITIES, default='h')
+    parser.add_argument('--output', help='movie file, in the media folder by default')
+    args = parser.parse_args(argv)
+
+    module_name = args.module.removesuffix('.py')
+    config.quality = QUALITIES[args.quality]
+    module = importlib.import_module(module_name)
+    classes = {cls.__name__: cls for cls in scene_classes(module)}
+    if args.scene is not None and args.scene not in classes:
+        parser.error(f'unknown scene: {args.scene}')
+    scene_cls = classes[args.scene or next(iter(classes))]
+
+    if len(split(scene_cls)) > 1 and shutil.which('ffmpeg') is None:
+        parser.error('ffmpeg is needed to join the parts')
+
+    folder = os.path.join(config.media_dir, 'parts', module_name, scene_cls.__name__)
+    os.makedirs(folder, exist_ok=True)
+    settings = {'pixel_width': config.pixel_width, 'pixel_height': config.pixel_height,
+                'frame_rate': config.frame_rate, 'media_dir': config.media_dir,
+                'write_to_movie': True}
+
+    parts = split(scene_cls)
+    methods = [name for part in parts for name in part]
+    targets, jobs = [], []
+    for k, part in enumerate(parts):
+        others = [name for name in methods if name not in part]
+        target = os.path.join(folder, f'{k}.{part_key(scene_cls, part, others)}.mp4')
+        targets.append(target)
+
+        label = ', '.join(part) or 'construct'
+        if os.path.exists(target):
+            print(f'cached    {label}', file=sys.stderr)
+        else:
+            print(f'rendering {label}', file=sys.stderr)
+            video_dir = os.path.join(folder, f'{k}.tmp')
+            jobs.append((module_name, scene_cls.__name__, others,
+                         dict(settings, video_dir=video_dir), target))
+
+    with ProcessPoolExecutor(min(args.workers, max(len(jobs), 1))) as pool:
+        list(pool.map(render_part, jobs))
+    for _, _, _, settings, _ in jobs:
+        shutil.rmtree(settings['video_dir'], ignore_errors=True)
+
+    # parts of previous versions
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        if name.endswith('.mp4') and path not in targets:
+            os.remove(path)
+
+    output = args.output or folder + '.mp4'
+    if len(targets) == 1:
+        shutil.copyfile(targets[0], output)
+    else:
+        concat(targets, output)
+    print(output)
+
+if __name__ == '__main__':
+    main()
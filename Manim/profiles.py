@@ -0,0 +1,75 @@
+"""preview and production profiles shared by the scenes
+
+The profile is chosen with the RENDER_PROFILE environment variable, and is
+production by default, which renders exactly what the scenes describe. The
+preview profile trades the looks for speed while iterating on a chapter:
+the random layouts get fewer cells (cell_count), the curved edges fewer
+segments (density), the huge lagged groups play all at once in a shorter
+time (lag, duration), the expensive decorative animations guarded by
+PRODUCTION are skipped, and self.wait() only waits for stop conditions in
+the scenes deriving from PreviewWaits.
+
+    RENDER_PROFILE=preview manim -ql 3-points.py Main"""
+
+import os
+
+class Profile:
+    """cells and segments scale the cell counts and segment densities, lags
+    and durations the lag ratios and run times of the huge groups, waits
+    tells whether self.wait() waits in a PreviewWaits scene"""
+
+    def __init__(self, name, cells=1, segments=1, lags=1, durations=1, waits=True):
+        self.name = name
+        self.cells, self.segments, self.waits = cells, segments, waits
+        self.lags, self.durations = lags, durations
+
+    def __repr__(self):
+        return f'Profile({self.name!r})'
+
+PROFILES = {'production': Profile('production'),
+            'preview': Profile('preview', cells=.2, segments=.3, lags=0, durations=.25,
+                               waits=False)}
+
+name = os.environ.get('RENDER_PROFILE', 'production')
+if name not in PROFILES:
+    raise ValueError(f'RENDER_PROFILE: unknown profile {name!r}, '
+                     f'expected one of {", ".join(PROFILES)}')
+PROFILE = PROFILES[name]
+PRODUCTION = PROFILE.name == 'production'
+
+def cell_count(n):
+    """number of cells to use for a random layout of n cells"""
+
+    if PRODUCTION:
+        return n
+    return max(3, round(n*PROFILE.cells))
+
+def density(segments_density):
+    """segments_density to use for Options(segments_density=...)"""
+
+    if PRODUCTION:
+        return segments_density
+    return max(2, round(segments_density*PROFILE.segments))
+
+def lag(lag_ratio):
+    """lag_ratio to use for a group of hundreds of animations"""
+
+    if PRODUCTION:
+        return lag_ratio
+    return lag_ratio*PROFILE.lags
+
+def duration(run_time):
+    """run_time to use for a group of hundreds of animations"""
+
+    if PRODUCTION:
+        return run_time
+    return run_time*PROFILE.durations
+
+class PreviewWaits:
+    """mixin of the chapter scenes, class Main(PreviewWaits, Scene), whose
+    self.wait() only waits for stop conditions when the profile does not
+    wait"""
+
+    def wait(self, duration=1, stop_condition=None, **kwargs):
+        if PROFILE.waits or stop_condition is not None:
+            super().wait(duration, stop_condition=stop_condition, **kwargs)
@@ -0,0 +1,57 @@
+"""nearest-site label images
+
+Every pixel of a grid gets the index of its closest site in one vectorized
+pass, cut in chunks of pixels so that the pairwise distances held in memory
+stay bounded whatever the resolution. Distances are euclidean or manhattan,
+multiplied by the weight of the site like in the weighted diagrams."""
+
+import numpy as np
+
+from voronoi import CHUNK
+
+METRICS = ('euclidean', 'manhattan')
+
+def grid_centers(low, high, shape):
+    """(nx, ny, 2) centers of the pixels of a grid of shape (nx, ny) covering
+    the box from low to high, x first like the screens of the scenes"""
+
+    (x0, y0), (x1, y1) = low, high
+    nx, ny = shape
+    dx, dy = (x1-x0) / nx, (y1-y0) / ny
+    xs = np.arange(nx)*dx + (x0 + dx/2)
+    ys = np.arange(ny)*dy + (y0 + dy/2)
+    return np.stack(np.meshgrid(xs, ys, indexing='ij'), axis=-1)
+
+def nearest_sites(points, sites, weights=None, metric='euclidean'):
+    """index of the closest site of every (M, 2) point"""
+
+    if metric not in METRICS:
+        raise ValueError(f'nearest_sites: unknown metric {metric!r}')
+
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    sites = np.asarray(sites, dtype=float).reshape(-1, 2)
+    if weights is not None:
+        # euclidean distances are compared squared
+        weights = np.asarray(weights, dtype=float)
+        weights = weights**2 if metric == 'euclidean' else weights
+
+    labels = np.empty(len(points), dtype=np.intp)
+    step = max(1, CHUNK // max(len(sites), 1))
+    for a in range(0, len(points), step):
+        diff = points[a:a+step, None] - sites[None]
+        if metric == 'euclidean':
+            d = np.einsum('mnk,mnk->mn', diff, diff)
+        else:
+            d = np.abs(diff).sum(axis=-1)
+        if weights is not None:
+            d *= weights
+        labels[a:a+step] = d.argmin(axis=1)
+
+    return labels
+
+def rasterize(sites, low, high, shape, weights=None, metric='euclidean'):
+    """(nx, ny) image of the closest site of every pixel of the grid (see
+    grid_centers)"""
+
+    centers = grid_centers(low, high, shape)
+    return nearest_sites(centers.reshape(-1, 2), sites, weights, metric).reshape(shape)
@@ -0,0 +1,123 @@
+"""render every scene of the series in parallel
+
+The chapters (0-intro.py to 8-wedges.py), structure.py and thumbnail.py are
+searched for Scene subclasses, and every scene is rendered by its own manim
+process, jobs at a time. The scenes that took the longest on the previous
+runs start first (the ones never rendered before even earlier), so that a
+long chapter does not end up running alone at the end. The durations are
+kept in render_times.json in the media folder, and the logs of every scene
+in its logs folder.
+
+    python render_all.py -q h --jobs 8
+    python render_all.py 3-points 8-wedges -- --disable_caching"""
+
+import os
+import re
+import ast
+import sys
+import json
+import time
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from manim import config
+
+FOLDER = os.path.dirname(os.path.abspath(__file__))
+CHAPTER = re.compile(r'\d+-.+\.py$')
+EXTRA = ('structure.py', 'thumbnail.py')
+
+def find_scenes(names=None):
+    """(file, scene) pairs of the chapters and extra modules, or of the ones
+    in names"""
+
+    files = sorted(f for f in os.listdir(FOLDER) if CHAPTER.match(f)) + list(EXTRA)
+    if names:
+        wanted = {name.removesuffix('.py') for name in names}
+        files = [f for f in files if f.removesuffix('.py') in wanted]
+
+    scenes = []
+    for file in files:
+        with open(os.path.join(FOLDER, file)) as f:
+            tree = ast.parse(f.read())
+        for node in tree.body:
+            bases = [getattr(base, 'id', getattr(base, 'attr', '')) for base in node.bases] \
+                    if isinstance(node, ast.ClassDef) else []
+            if any(base.endswith('Scene') for base in bases):
+                scenes.append((file, node.name))
+    return scenes
+
+def render(file, scene, quality, extra, logs):
+    """run manim on one scene, returns its return code and duration"""
+
+    log = os.path.join(logs, f'{file.removesuffix(".py")}.{scene}.log')
+    start = time.perf_counter()
+    with open(log, 'w') as f:
+        code = subprocess.run([sys.executable, '-m', 'manim', 'render', f'-q{quality}',
+                               '--progress_bar', 'none', *extra, file, scene],
+                              cwd=FOLDER, stdout=f, stderr=subprocess.STDOUT).returncode
+    return code, time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('modules', nargs='*', help='modules to render, all of them by default')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count())
+    parser.add_argument('-q', '--quality', choices='lmhpk', default='h')
+    parser.epilog = 'arguments after -- are given to manim'
+
+    argv = sys.argv[1:] if argv is None else list(argv)
+    extra = []
+    if '--' in argv:
+        argv, extra = argv[:argv.index('--')], argv[argv.index('--')+1:]
+    args = parser.parse_args(argv)
+
+    media = os.path.join(FOLDER, config.media_dir)
+    logs = os.path.join(media, 'logs')
+    os.makedirs(logs, exist_ok=True)
+    times_path = os.path.join(media, 'render_times.json')
+    times = {}
+    if os.path.exists(times_path):
+        with open(times_path) as f:
+            times = json.load(f)
+
+    key = lambda file, scene: f'{file}:{scene}:{args.quality}'
+    scenes = find_scenes(args.modules)
+    scenes.sort(key=lambda s: times.get(key(*s), float('inf')), reverse=True)
+    if not scenes:
+        parser.error('no scene found')
+
+    expected = sum(times.get(key(*s), 0) for s in scenes)
+    report, done, start = [], 0, time.perf_counter()
+    with ThreadPoolExecutor(args.jobs) as pool:
+        futures = {pool.submit(render, *s, args.quality, extra, logs): s for s in scenes}
+        for future in as_completed(futures):
+            (file, scene), (code, duration) = futures[future], future.result()
+            done += 1
+            expected -= times.get(key(file, scene), 0)
+            if code == 0:
+                times[key(file, scene)] = duration
+            report.append({'file': file, 'scene': scene, 'seconds': duration, 'code': code})
+            status = 'ok' if code == 0 else f'failed ({code}), see the logs'
+            print(f'[{done}/{len(scenes)}] {file} {scene}: {duration:.1f} s {status}, '
+                  f'{time.perf_counter() - start:.0f} s elapsed'
+                  + (f', about {max(expected, 0)/args.jobs:.0f} s left' if expected > 0 else ''),
+                  file=sys.stderr)
+
+    with open(times_path, 'w') as f:
+        json.dump(times, f, indent=2, sort_keys=True)
+
+    report.sort(key=lambda r: r['seconds'], reverse=True)
+    print(f'{"seconds":>9}  scene')
+    for r in report:
+        print(f'{r["seconds"]:9.1f}  {r["file"]} {r["scene"]}'
+              + ('' if r['code'] == 0 else f'  failed ({r["code"]})'))
+    print(f'{time.perf_counter() - start:9.1f}  total on {args.jobs} jobs')
+
+    with open(os.path.join(media, 'render_report.json'), 'w') as f:
+        json.dump({'quality': args.quality, 'jobs': args.jobs, 'scenes': report,
+                   'seconds': time.perf_counter() - start}, f, indent=2)
+
+    return 0 if all(r['code'] == 0 for r in report) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""render one long animation of a scene in time slices, in parallel
+
+The animation number play of the scene (counted like manim -n does, waits
+included, see dryrun.py to list them) is cut in slices of consecutive
+frames. Every worker runs the scene up to that animation, skipping the ones
+before it like manim -n (their updaters only see the final values), renders
+the frames of its slice and stops there, then the partial movies are joined
+by ffmpeg without re-encoding. A timeline the scene bakes is built once, by
+the first worker to reach it, the others wait for its files.
+
+The frames have to be functions of t and of the state before the animation,
+like the DiagramAnimation plays: updaters using dt see a jump at the start
+of every slice.
+
+    python slices.py 8-wedges Main 9 --workers 16 -q h"""
+
+import os
+import shutil
+import argparse
+import importlib
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from tqdm import tqdm
+from manim import config
+
+QUALITIES = {'l': 'low_quality', 'm': 'medium_quality', 'h': 'high_quality',
+             'p': 'production_quality', 'k': 'fourk_quality'}
+
+def sliced(scene_cls, play, k, count):
+    """subclass of scene_cls only rendering the k-th of count slices of the
+    frames of its animation number play"""
+
+    class Sliced(scene_cls):
+        def get_time_progression(self, run_time, description, n_iterations=None,
+                                 override_skip_animations=False):
+            if self.renderer.num_plays != play or self.renderer.skip_animations:
+                return super().get_time_progression(run_time, description, n_iterations,
+                                                    override_skip_animations)
+
+            times = np.arange(0, run_time, 1/config.frame_rate)
+            first, last = k*len(times) // count, (k+1)*len(times) // count
+            return tqdm(times[first:last], desc=f'{description} ({k+1}/{count})',
+                        leave=config.progress_bar == 'leave',
+                        disable=config.progress_bar == 'none')
+
+    Sliced.__name__ = Sliced.__qualname__ = scene_cls.__name__
+    return Sliced
+
+def render_slice(job):
+    """path of the partial movie of the slice rendered by job"""
+
+    module, name, play, k, count, settings = job
+    for key, value in settings.items():
+        config[key] = value
+
+    scene_cls = getattr(importlib.import_module(module), name)
+    scene = sliced(scene_cls, play, k, count)()
+    scene.render()
+    return scene.renderer.file_writer.partial_movie_files[play]
+
+def concat(paths, output):
+    listing = output + '.txt'
+    with open(listing, 'w') as f:
+        for path in paths:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+
+    subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+                    '-i', listing, '-c', 'copy', output], check=True)
+    os.remove(listing)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('module', help='chapter of the scene, e.g. 8-wedges')
+    parser.add_argument('scene', help='scene class, e.g. Main')
+    parser.add_argument('play', type=int, help='number of the animation to render')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--slices', type=int, help='number of slices, --workers by default')
+    parser.add_argument('-q', '--quality', choices=QUALITIES, default='h')
+    parser.add_argument('--output', help='movie file, in the media folder by default')
+    args = parser.parse_args(argv)
+
+    if shutil.which('ffmpeg') is None:
+        parser.error('ffmpeg is needed to join the slices')
+
+    module = args.module.removesuffix('.py')
+    config.quality = QUALITIES[args.quality]
+    count = args.slices or args.workers
+
+    folder = os.path.join(config.media_dir, 'slices', f'{module}.{args.scene}.{args.play}')
+    output = args.output or folder + '.mp4'
+    settings = {'pixel_width': config.pixel_width, 'pixel_height': config.pixel_height,
+                'frame_rate': config.frame_rate, 'media_dir': config.media_dir,
+                'disable_caching': True, 'write_to_movie': True,
+                'from_animation_number': args.play, 'upto_animation_number': args.play}
+
+    # every slice gets its own video folder, the timelines stay shared
+    jobs = [(module, args.scene, args.play, k, count,
+             dict(settings, video_dir=os.path.join(folder, str(k))))
+            for k in range(count)]
+    with ProcessPoolExecutor(args.workers) as pool:
+        paths = list(pool.map(render_slice, jobs))
+
+    concat(paths, output)
+    shutil.rmtree(folder)
+    print(output)
+
+if __name__ == '__main__':
+    main()
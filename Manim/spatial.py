@@ -0,0 +1,145 @@
+"""uniform grid index over the sites of a diagram
+
+Sites are binned in squares holding about one site each, and queries look at
+the rings of squares around every probe, all probes at once, until the
+closest weight times the ring distance cannot beat what was found. Distances
+are weight times the euclidean distance, like in the weighted diagrams, and
+rebuilding after the sites moved is a single sort."""
+
+import numpy as np
+
+from voronoi import cells_to_arrays
+
+class CellIndex:
+    """nearest, k-nearest and radius queries over (N, 2) sites with optional
+    (N,) weights, for one (2,) point or an (M, 2) array of points"""
+
+    def __init__(self, sites, weights=None):
+        self.rebuild(sites, weights)
+
+    @classmethod
+    def from_cells(cls, cells):
+        return cls(*cells_to_arrays(cells))
+
+    def rebuild(self, sites, weights=None):
+        self.sites = np.asarray(sites, dtype=float).reshape(-1, 2)
+        n = len(self.sites)
+        self.weights = np.ones(n) if weights is None else np.asarray(weights, dtype=float)
+        # weighted distances are compared squared
+        self.weights2 = self.weights**2
+        self.wmin = self.weights.min(initial=np.inf)
+
+        if n == 0:
+            self.low, self.size, self.shape = np.zeros(2), 1., np.ones(2, dtype=np.intp)
+            self.order, self.starts = np.zeros(0, dtype=np.intp), np.zeros(2, dtype=np.intp)
+            return
+
+        self.low, high = self.sites.min(axis=0), self.sites.max(axis=0)
+        self.size = max(np.sqrt(np.prod(high-self.low + 1e-12) / n), 1e-12)
+        self.shape = np.floor((high-self.low) / self.size).astype(np.intp) + 1
+
+        key = self._key(self._square(self.sites))
+        self.order = np.argsort(key, kind='stable')
+        self.starts = np.searchsorted(key[self.order], np.arange(np.prod(self.shape)+1))
+
+    def update_from_cells(self, cells):
+        self.rebuild(*cells_to_arrays(cells))
+
+    def __len__(self):
+        return len(self.sites)
+
+    def _square(self, points):
+        ij = np.floor((points-self.low) / self.size).astype(np.intp)
+        return np.clip(ij, 0, self.shape-1)
+
+    def _key(self, ij):
+        return ij[..., 0]*self.shape[1] + ij[..., 1]
+
+    def _gather(self, probes, ij, di, dj):
+        """(probe, site) pairs for the sites in the squares ij + (di, dj) of
+        every probe"""
+
+        ci, cj = ij[:, 0, None] + di, ij[:, 1, None] + dj
+        inside = (ci >= 0) & (ci < self.shape[0]) & (cj >= 0) & (cj < self.shape[1])
+        owner = np.broadcast_to(probes[:, None], ci.shape)[inside]
+        square = self._key(np.stack((ci[inside], cj[inside]), axis=-1))
+
+        first, counts = self.starts[square], np.diff(self.starts)[square]
+        owner = np.repeat(owner, counts)
+        slot = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts - first, counts)
+        return owner, self.order[slot]
+
+    def _distances(self, points, owner, site):
+        diff = self.sites[site] - points[owner]
+        return (diff[:, 0]**2 + diff[:, 1]**2) * self.weights2[site]
+
+    def k_nearest(self, points, k):
+        """(M, k) indices of the k closest sites of the points, closest first,
+        and their (M, k) weighted distances"""
+
+        points = np.asarray(points, dtype=float)
+        single = points.ndim == 1
+        points = points.reshape(-1, 2)
+        m, k = len(points), min(k, len(self))
+
+        ij = self._square(points)
+        best = [np.zeros(0, dtype=np.intp)] * 3
+        active = np.arange(m)
+        for r in range(int(self.shape.max())):
+            side = np.arange(-r, r+1)
+            di, dj = (a.ravel() for a in np.meshgrid(side, side, indexing='ij'))
+            ring = np.maximum(np.abs(di), np.abs(dj)) == r
+            owner, site = self._gather(active, ij[active], di[ring], dj[ring])
+
+            # keep the k best of every probe, ties going to the lowest index
+            owner, site = np.concatenate((best[0], owner)), np.concatenate((best[1], site))
+            dist = self._distances(points, owner, site)
+            order = np.lexsort((site, dist, owner))
+            owner, site, dist = owner[order], site[order], dist[order]
+            rank = np.arange(len(owner)) - np.searchsorted(owner, owner)
+            keep = rank < k
+            best = owner[keep], site[keep], dist[keep]
+
+            # the sites in the next rings are at least r squares away
+            found = np.bincount(best[0], minlength=m)
+            worst = np.full(m, np.inf)
+            worst[best[0][rank[keep] == k-1]] = best[2][rank[keep] == k-1]
+            active = active[(found[active] < k) | (worst[active] > self.wmin**2 * (r*self.size)**2)]
+            if not len(active):
+                break
+
+        indices = best[1].reshape(m, k)
+        dist = np.sqrt(best[2].reshape(m, k))
+        if single:
+            return indices[0], dist[0]
+        return indices, dist
+
+    def nearest(self, points):
+        """index of the closest site of every point"""
+
+        indices, _ = self.k_nearest(points, 1)
+        return indices[..., 0]
+
+    def within(self, points, radius):
+        """indices of the sites at a weighted distance of at most radius from
+        every point, closest first, as one array per point"""
+
+        points = np.asarray(points, dtype=float)
+        single = points.ndim == 1
+        points = points.reshape(-1, 2)
+
+        reach = min(int(np.ceil(radius / (self.wmin*self.size))) if self.wmin > 0
+                    else np.inf, int(self.shape.max()))
+        side = np.arange(-reach, reach+1)
+        di, dj = (a.ravel() for a in np.meshgrid(side, side, indexing='ij'))
+        owner, site = self._gather(np.arange(len(points)), self._square(points), di, dj)
+
+        dist = self._distances(points, owner, site)
+        close = dist <= radius**2
+        owner, site, dist = owner[close], site[close], dist[close]
+        order = np.lexsort((site, dist, owner))
+        found = np.split(site[order], np.cumsum(np.bincount(owner, minlength=len(points)))[:-1])
+
+        if single:
+            return found[0]
+        return found
@@ -0,0 +1,45 @@
+"""checks of the numpy diagram engine
+
+    python -m pytest test_voronoi.py"""
+
+import numpy as np
+import pytest
+
+from fast_voronoi import Bounds, Options
+
+from voronoi import make_diagram, diagram_neighbors
+
+BOUNDS = Bounds(-8, -5, 16, 10)
+OPTIONS = Options(segments_density=4, divide_lines=True, complete_polygons=False)
+
+def areas(diagram, n):
+    """total area of the polygons of every cell"""
+
+    total = np.zeros(n)
+    for i, points in diagram:
+        x, y = points[:, 0], points[:, 1]
+        total[i] += (np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2
+    return total
+
+@pytest.mark.parametrize('weighted', [False, True])
+def test_duplicate_sites(weighted):
+    """the first copy of a site gets the cell, the other copies are empty"""
+
+    rng = np.random.default_rng(0)
+    sites = rng.random((20, 2)) * (14, 8) + (-7, -4)
+    weights = rng.random(20)*3 + 2 if weighted else np.ones(20)
+    sites[[7, 12]], weights[[7, 12]] = sites[3], weights[3]
+
+    diagram = make_diagram(OPTIONS, BOUNDS, sites, weights)
+    area = areas(diagram, 20)
+    assert not np.isin(diagram.indices, [7, 12]).any()
+    assert area[3] > 0
+    assert np.isclose(area.sum(), BOUNDS.w*BOUNDS.h)
+
+    indptr, indices = diagram_neighbors(diagram, 20, BOUNDS)
+    assert not np.isin(indices, [7, 12]).any()
+    assert indptr[8] == indptr[7] and indptr[13] == indptr[12]
+
+    unique = np.delete(np.arange(20), [7, 12])
+    alone = make_diagram(OPTIONS, BOUNDS, sites[unique], weights[unique])
+    assert np.allclose(areas(alone, 18), area[unique])
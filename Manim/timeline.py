@@ -0,0 +1,162 @@
+"""precomputed diagram timelines
+
+A cells updater is sampled at every value it will take during an animation
+ahead of time, the diagrams are built by a pool of worker processes and
+written to memory-mapped files, and the scene only slices them while
+rendering. Timelines are keyed by the sampled sites and weights along with
+the bounds, options and tolerance, so re-renders at the same quality skip the geometry
+entirely."""
+
+import os
+import shutil
+import hashlib
+from contextlib import contextmanager
+from multiprocessing import Pool
+
+try:
+    import fcntl
+except ImportError:
+    # no locks on windows, the processes baking at once all compute it
+    fcntl = None
+
+import numpy as np
+from manim import config
+
+from voronoi import Diagram, cells_to_arrays, make_diagram
+
+def frame_values(run_time, rate_func, frame_rate=None):
+    """values taken by a ValueTracker animated from 0 to 1 with these
+    run_time and rate_func, one per rendered frame and the final one"""
+
+    frame_rate = frame_rate or config.frame_rate
+    times = np.arange(0, run_time, 1/frame_rate)
+    return np.unique([rate_func(t) for t in times/run_time] + [rate_func(1)])
+
+def _bake_chunk(job):
+    options, bounds, sites, weights, tolerance = job
+    diagrams = [make_diagram(options, bounds, s, w, tolerance) for s, w in zip(sites, weights)]
+    return [(d.indices, d.vertices, d.offsets) for d in diagrams]
+
+class Timeline:
+    """diagrams for a set of updater values, read from the memory-mapped files
+    in folder"""
+
+    def __init__(self, folder):
+        load = lambda name: np.load(os.path.join(folder, name + '.npy'), mmap_mode='r')
+        self.frames = load('frames')
+        self.indices = load('indices')
+        self.offsets = load('offsets')
+        self.vertices = load('vertices')
+        self.values = np.load(os.path.join(folder, 'values.npy'))
+        # frame index and diagram of the last call
+        self.last = None, None
+
+    def __len__(self):
+        return len(self.values)
+
+    def frame(self, value):
+        """diagram of the sampled value closest to value, its arrays are views
+        of the files, except for the offsets, the same object is returned as
+        long as the closest value does not change"""
+
+        k = np.abs(self.values - value).argmin()
+        if k == self.last[0]:
+            return self.last[1]
+        first, last = self.frames[k], self.frames[k+1]
+
+        offsets = self.offsets[first:last+1]
+        vertices = self.vertices[offsets[0]:offsets[-1]]
+        diagram = Diagram(self.indices[first:last], vertices, offsets - offsets[0])
+        self.last = k, diagram
+        return diagram
+
+@contextmanager
+def _locked(path):
+    """exclusive lock on the file path while in the block"""
+
+    if fcntl is None:
+        yield
+        return
+    with open(path, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def bake(options, bounds, cells, cells_updater, values, processes=None, folder=None,
+         tolerance=None):
+    """Timeline of the diagrams of cells after cells_updater(value), for every
+    value in values (see frame_values), built on processes workers with
+    tolerance (see make_diagram)
+
+    The processes baking the same timeline at once (time slices of one
+    animation) wait for the first one and read its files."""
+
+    values = np.asarray(values, dtype=float)
+    sites, weights = [], []
+    for value in values:
+        cells_updater(value)
+        s, w = cells_to_arrays(cells)
+        sites.append(s)
+        weights.append(w)
+    sites, weights = np.array(sites), np.array(weights)
+
+    key = hashlib.sha1()
+    key.update(repr((sorted(vars(options).items()), tolerance or None,
+                     bounds.left, bounds.top, bounds.w, bounds.h)).encode())
+    for array in values, sites, weights:
+        key.update(array.tobytes())
+
+    folder = folder or os.path.join(config.media_dir, 'timelines')
+    os.makedirs(folder, exist_ok=True)
+    folder = os.path.join(folder, key.hexdigest())
+    with _locked(folder + '.lock'):
+        if not os.path.exists(os.path.join(folder, 'values.npy')):
+            _bake(options, bounds, values, sites, weights, tolerance, processes, folder)
+    return Timeline(folder)
+
+def _bake(options, bounds, values, sites, weights, tolerance, processes, folder):
+    processes = processes or os.cpu_count()
+    step = -(-len(values) // (4*processes))
+    jobs = [(options, bounds, sites[a:a+step], weights[a:a+step], tolerance)
+            for a in range(0, len(values), step)]
+    with Pool(processes) as pool:
+        diagrams = [d for chunk in pool.imap(_bake_chunk, jobs) for d in chunk]
+
+    polygons = np.array([len(indices) for indices, _, _ in diagrams])
+    lengths = np.concatenate([np.diff(offsets) for _, _, offsets in diagrams])
+
+    # written aside then moved in place, so that an interrupted bake is
+    # never read as complete
+    final, folder = folder, f'{folder}.{os.getpid()}'
+    os.makedirs(folder, exist_ok=True)
+    def save(name, dtype, shape):
+        return np.lib.format.open_memmap(os.path.join(folder, name + '.npy'),
+                                         mode='w+', dtype=dtype, shape=shape)
+
+    frames = save('frames', np.int64, (len(values)+1,))
+    frames[0] = 0
+    np.cumsum(polygons, out=frames[1:])
+    offsets = save('offsets', np.int64, (len(lengths)+1,))
+    offsets[0] = 0
+    np.cumsum(lengths, out=offsets[1:])
+
+    indices = save('indices', np.int64, (int(frames[-1]),))
+    vertices = save('vertices', float, (int(offsets[-1]), 2))
+    for k, (i, v, _) in enumerate(diagrams):
+        indices[frames[k]:frames[k+1]] = i
+        first = offsets[frames[k]]
+        vertices[first:first+len(v)] = v
+
+    for array in frames, offsets, indices, vertices:
+        array.flush()
+    # written last, marks the timeline as complete
+    np.save(os.path.join(folder, 'values.npy'), values)
+    del frames, offsets, indices, vertices
+
+    try:
+        os.rename(folder, final)
+    except OSError:
+        # another process got there first, without locks
+        shutil.rmtree(folder)
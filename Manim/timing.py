@@ -0,0 +1,204 @@
+"""wall time of the updaters of the scenes
+
+While an UpdaterTimer is installed, every updater added to a mobject is
+wrapped to record the duration of each of its calls, along with the frame
+and the play it belongs to. Updaters are labelled after the function that
+drives them: the cells updater of a DiagramAnimation, the function called by
+a lambda (dance.rotate in a lambda t: func(voronoi, t), create_number in an
+always_redraw), or their own name. Plays are labelled after the updaters
+that ran during them, or their animations.
+
+    with UpdaterTimer() as timer:
+        Main().render()
+    print(timer.summary())
+    timer.write_trace('trace.json')
+
+The trace opens in chrome://tracing or ui.perfetto.dev."""
+
+import os
+import json
+import time
+from functools import partial, wraps
+
+from manim import Mobject, Scene
+
+def describe(func):
+    """short name of the function driving the updater func"""
+
+    func = getattr(func, 'driver', None) or func
+    while isinstance(func, partial):
+        func = func.func
+
+    code = getattr(func, '__code__', None)
+    if code is not None and code.co_name == '<lambda>':
+        # lambdas are named after the first function of their closure, or
+        # global function, that they use
+        values = [cell.cell_contents for cell in func.__closure__ or ()]
+        values += [func.__globals__[name] for name in code.co_names if name in func.__globals__]
+        for value in values:
+            if callable(value) and not isinstance(value, (type, Mobject)):
+                return describe(value)
+        return f'<lambda {os.path.basename(code.co_filename)}:{code.co_firstlineno}>'
+
+    if hasattr(func, '__self__') and hasattr(func, '__func__'):
+        return f'{type(func.__self__).__name__}.{func.__name__}'
+    name = getattr(func, '__qualname__', None) or type(func).__name__
+    return name.split('<locals>.')[-1]
+
+class UpdaterTimer:
+    """records the calls of the updaters added while installed (see the module
+    docstring), as (play, frame, label, start, duration) tuples in calls, the
+    plays as dicts in plays"""
+
+    def __init__(self):
+        self.calls = []
+        self.plays = []
+        self.frames = []
+        self.play = self.frame = None
+        self.origin = time.perf_counter()
+        self.patched = {}
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, *_):
+        self.uninstall()
+
+    def install(self):
+        timer = self
+        add_updater, remove_updater = Mobject.add_updater, Mobject.remove_updater
+        play, update_mobjects = Scene.play, Scene.update_mobjects
+        self.patched = {(Mobject, 'add_updater'): add_updater,
+                        (Mobject, 'remove_updater'): remove_updater,
+                        (Scene, 'play'): play, (Scene, 'update_mobjects'): update_mobjects}
+
+        def timed_add_updater(mobject, update_function, *args, **kwargs):
+            return add_updater(mobject, timer.wrap(update_function), *args, **kwargs)
+
+        def timed_remove_updater(mobject, update_function):
+            for updater in list(mobject.updaters):
+                if getattr(updater, '__wrapped__', None) is update_function:
+                    remove_updater(mobject, updater)
+            return remove_updater(mobject, update_function)
+
+        def timed_play(scene, *args, **kwargs):
+            timer.begin_play(args)
+            try:
+                return play(scene, *args, **kwargs)
+            finally:
+                timer.end_play()
+
+        def timed_update_mobjects(scene, dt):
+            start = time.perf_counter()
+            timer.frame = len(timer.frames)
+            timer.frames.append(None)
+            update_mobjects(scene, dt)
+            timer.frames[timer.frame] = (timer.play, start - timer.origin,
+                                         time.perf_counter() - start)
+            timer.frame = None
+
+        Mobject.add_updater, Mobject.remove_updater = timed_add_updater, timed_remove_updater
+        Scene.play, Scene.update_mobjects = timed_play, timed_update_mobjects
+
+    def uninstall(self):
+        for (cls, name), method in self.patched.items():
+            setattr(cls, name, method)
+        self.patched = {}
+
+    def wrap(self, update_function):
+        if hasattr(update_function, '__wrapped__'):
+            return update_function
+        label = describe(update_function)
+
+        @wraps(update_function)
+        def timed(*args):
+            start = time.perf_counter()
+            try:
+                return update_function(*args)
+            finally:
+                self.calls.append((self.play, self.frame, label, start - self.origin,
+                                   time.perf_counter() - start))
+
+        return timed
+
+    def begin_play(self, args):
+        self.play = len(self.plays)
+        self.plays.append({'start': time.perf_counter() - self.origin, 'duration': None,
+                           'animations': [type(arg).__name__ for arg in args]})
+
+    def end_play(self):
+        play = self.plays[self.play]
+        play['duration'] = time.perf_counter() - self.origin - play['start']
+        play['label'] = self.label(self.play)
+        self.play = None
+
+    def label(self, play):
+        """labels of the updaters that ran during play, most expensive first,
+        or its animations if there were none"""
+
+        totals = {}
+        for p, _, label, _, duration in self.calls:
+            if p == play:
+                totals[label] = totals.get(label, 0) + duration
+        if not totals:
+            return ', '.join(self.plays[play]['animations']) or 'play'
+        return ', '.join(sorted(totals, key=totals.get, reverse=True))
+
+    def summary(self, top=None):
+        """table of the plays, slowest first, with the time spent in each of
+        their updaters: calls, total, mean and worst call"""
+
+        stats = {}
+        for play, _, label, _, duration in self.calls:
+            calls, total, worst = stats.get((play, label), (0, 0, 0))
+            stats[play, label] = calls+1, total+duration, max(worst, duration)
+
+        updaters = {}
+        for (play, label), stat in stats.items():
+            updaters.setdefault(play, []).append((label, *stat))
+
+        def cost(play):
+            return sum(total for _, _, total, _ in updaters.get(play, ()))
+
+        order = sorted(updaters, key=lambda play: cost(play), reverse=True)
+        lines = [f'{"play":>5} {"updater":<32} {"calls":>6} {"total ms":>10} '
+                 f'{"mean ms":>9} {"worst ms":>9}']
+        for play in order[:top]:
+            if play is None:
+                name, duration = 'outside of the plays', cost(play)
+            else:
+                name, duration = self.plays[play]['label'], self.plays[play]['duration']
+            lines.append(f'{"-" if play is None else play:>5} {name} '
+                         f'({duration*1e3:.1f} ms)')
+            for label, calls, total, worst in sorted(updaters[play], key=lambda u: -u[2]):
+                lines.append(f'{"":>5} {label:<32} {calls:>6} {total*1e3:10.2f} '
+                             f'{total/calls*1e3:9.3f} {worst*1e3:9.3f}')
+        return '\n'.join(lines)
+
+    def trace(self):
+        """chrome trace events: plays on the first row, frames on the second
+        and the updaters on the third"""
+
+        us = lambda seconds: seconds * 1e6
+        events = []
+        for k, play in enumerate(self.plays):
+            if play['duration'] is not None:
+                events.append({'name': play.get('label', 'play'), 'cat': 'play', 'ph': 'X',
+                               'ts': us(play['start']), 'dur': us(play['duration']),
+                               'pid': 0, 'tid': 0, 'args': {'play': k}})
+        for k, frame in enumerate(self.frames):
+            if frame is not None:
+                play, start, duration = frame
+                events.append({'name': 'frame', 'cat': 'frame', 'ph': 'X', 'ts': us(start),
+                               'dur': us(duration), 'pid': 0, 'tid': 1,
+                               'args': {'play': play, 'frame': k}})
+        for play, frame, label, start, duration in self.calls:
+            events.append({'name': label, 'cat': 'updater', 'ph': 'X', 'ts': us(start),
+                           'dur': us(duration), 'pid': 0, 'tid': 2,
+                           'args': {'play': play, 'frame': frame}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.trace(), f)
@@ -1,11 +1,12 @@
-from manim import VGroup, Polygon, Dot
-from copy import deepcopy
+from manim import VGroup, Polygon, Dot, ValueTracker, ManimColor, config
 import numpy as np
 
 from fast_voronoi import Bounds, Options
-from fast_voronoi.polygons import make_polygons
 
 from theme import FG, COL3
+from profiles import density
+from voronoi import cells_to_arrays, diagram_from_cells, diagram_neighbors, neighbors_to_lists, \
+        diagram_cache, inset_polygons, is_weighted
 
 def get_bounds(camera, margin):
     cx, cy = camera.frame_center[:2]
@@ -20,37 +21,55 @@ def get_color_from_t(colors, t):
 
 smol = 1e-9
 def get_ends_from_bisector(box, line):
-    bounds: list[float] = [0]*4
+    starts, ends = get_ends_from_bisectors(box, [(line.M.x, line.M.y)], [(line.u.x, line.u.y)])
+    return tuple(starts[0].tolist()), tuple(ends[0].tolist())
 
-    if abs(line.u.x) > smol:
-        bounds[0] = (box.left-line.M.x) / line.u.x
-        bounds[1] = (box.right-line.M.x) / line.u.x
-    if abs(line.u.y) > smol:
-        bounds[2] = (box.top-line.M.y) / line.u.y
-        bounds[3] = (box.bottom-line.M.y) / line.u.y
+def get_ends_from_bisectors(box, M, u):
+    """batch version of get_ends_from_bisector, for lines M + t*u given as
+    (N, 2) arrays, returns the (N, 3) arrays of start and end points"""
 
-    if abs(line.u.x) > smol:
-        if abs(line.u.y) > smol:
-            bounds.sort()
+    M, u = np.asarray(M, dtype=float), np.asarray(u, dtype=float)
+    big = np.abs(u) > smol
+    safe = np.where(big, u, 1)
 
-            tmin = max(bounds[:2])
-            tmax = min(bounds[2:])
-        else:
-            tmin, tmax = sorted(bounds[:2])
-    else:
-        tmin, tmax = sorted(bounds[2:])
+    # parameters of the box sides, (-inf, inf) along the axes the line follows
+    low = np.array([box.left, box.top]) - M
+    high = np.array([box.right, box.bottom]) - M
+    bounds = np.stack((np.where(big, low/safe, -np.inf),
+                       np.where(big, high/safe, np.inf)), axis=-1)
+    bounds = np.sort(bounds.reshape(-1, 4), axis=1)
+
+    # the line enters and leaves the box at the two middle parameters
+    tmin, tmax = bounds[:, 1], bounds[:, 2]
+    still = ~big.any(axis=1)
+    tmin[still] = tmax[still] = 0
+
+    zeros = np.zeros((len(M), 1))
+    return (np.hstack((M + u*tmin[:, None], zeros)),
+            np.hstack((M + u*tmax[:, None], zeros)))
 
-    u, v = line.M + line.u*tmin, line.M + line.u*tmax
-    return (u.x, u.y, 0), (v.x, v.y, 0)
+def perp_bisectors(a, b):
+    """points M and directions u of the perpendicular bisectors of the (N, 2)
+    arrays of points a and b, as used by get_ends_from_bisectors"""
+
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    diff = b-a
+    return (a+b) / 2, np.column_stack((diff[:, 1], -diff[:, 0]))
+
+def get_all_bisectors_ends(box, sites):
+    """ends of the perpendicular bisectors of every pair of (N, 2) sites"""
+
+    i, j = np.triu_indices(len(sites), 1)
+    return get_ends_from_bisectors(box, *perp_bisectors(sites[i], sites[j]))
 
 def make_polygons_and_dots(cells, bounds, colors, theme=None):
     """if theme is None, assign the colors by index and return polygons+dots
     otherwise, use theme as a function to choose a color in colors, and return
     polygons, dots, and a list of colors"""
 
-    polygons = make_polygons(options, bounds, cells)
-    indices = [i for i, _ in polygons]
-    polygons = VGroup(Polygon(*[(u.x, u.y, 0) for u in polygon]) for _, polygon in polygons)
+    diagram = diagram_from_cells(options, bounds, cells)
+    indices, offsets, points = diagram.indices, diagram.offsets, diagram.points3()
+    polygons = VGroup(Polygon(*points[offsets[k]:offsets[k+1]]) for k in range(len(diagram)))
     dots = VGroup(Dot((cell.pos.x, cell.pos.y, 0)).set_z_index(1) for cell in cells)
 
     new_colors = []
@@ -68,52 +87,339 @@ def make_polygons_and_dots(cells, bounds, colors, theme=None):
         return polygons, dots
     return polygons, dots, new_colors
 
+def get_neighbors(bounds, cells, csr=False):
+    """neighbors of every cell, from a single diagram build instead of an
+    is_neighbor call per pair, as lists (ready for cells_intersections) or as
+    CSR arrays (indptr, indices) if csr is set"""
+
+    diagram = diagram_from_cells(options, bounds, cells)
+    indptr, indices = diagram_neighbors(diagram, len(cells), bounds)
+
+    if csr:
+        return indptr, indices
+    return neighbors_to_lists(indptr, indices)
+
 def add_polygons_margin(dots, polygons, margin):
-    """Warning: may not work for weighted Voronoi polygons"""
+    """inset all polygons by margin in a single pass (see inset_polygons),
+    polygons thinner than that are emptied
+
+    dots are not needed anymore to find the inside of the polygons, they are
+    kept for compatibility"""
+
+    corners = [polygon.get_vertices()[:, :2] for polygon in polygons]
+    offsets = np.zeros(len(corners)+1, dtype=np.intp)
+    np.cumsum([len(c) for c in corners], out=offsets[1:])
+    vertices = np.concatenate(corners) if corners else np.zeros((0, 2))
+
+    vertices, offsets, _, alive = inset_polygons(vertices, offsets, margin)
+    points = np.column_stack((vertices, np.zeros(len(vertices))))
+    for k, polygon in enumerate(polygons):
+        if alive[k]:
+            corners = points[offsets[k]:offsets[k+1]]
+            set_corners(polygon, np.vstack((corners, corners[:1])))
+        else:
+            polygon.clear_points()
+
+options = Options(segments_density=density(20), divide_lines=True, complete_polygons=False)
+
+def set_points(vmobject, points):
+    """copy points into the points array of vmobject, in place when it already
+    has the right size, never sharing them"""
+
+    if vmobject.points.shape == points.shape:
+        vmobject.points[...] = points
+    else:
+        vmobject.points = np.array(points, dtype=float)
+    return vmobject
+
+def set_corners(vmobject, corners):
+    """same as vmobject.set_points_as_corners(corners), but writing into the
+    points array of vmobject when it already has the right size"""
+
+    corners = np.asarray(corners, dtype=float)
+    nppcc = vmobject.n_points_per_cubic_curve
+    shape = (nppcc * max(len(corners)-1, 0), 3)
+    if vmobject.points.shape != shape:
+        vmobject.points = np.empty(shape)
+
+    points = vmobject.points.reshape(-1, nppcc, 3)
+    start, end = corners[:-1], corners[1:]
+    for k, t in enumerate(vmobject._bezier_t_values):
+        points[:, k] = (1-t)*start + t*end
+
+    return vmobject
+
+def color_table(colors, opacity=None):
+    """(N, 4) rgba array of colors with opacity, or (N, 3) rgb array to keep
+    the opacities of the styled mobjects"""
+
+    if opacity is None:
+        return np.array([ManimColor(color).to_rgb() for color in colors]).reshape(-1, 3)
+    return np.array([ManimColor(color).to_rgba_with_alpha(opacity)
+                     for color in colors]).reshape(-1, 4)
+
+class TableStyle:
+    """style function setting the precomputed colors of cell i, like set_fill
+    and set_stroke would: fill and stroke are color_table arrays, only the
+    channels they hold are written, and stroke_width is set if given"""
+
+    def __init__(self, fill=None, stroke=None, stroke_width=None):
+        self.fill, self.stroke, self.stroke_width = fill, stroke, stroke_width
+
+    def __call__(self, i, mobject, _):
+        for table, name in (self.fill, 'fill'), (self.stroke, 'stroke'):
+            if table is not None:
+                getattr(mobject, name + '_rgbas')[:, :table.shape[1]] = table[i]
+                if table.shape[1] == 4:
+                    setattr(mobject, name + '_opacity', table[i, 3])
+
+        if self.stroke_width is not None:
+            mobject.stroke_width = self.stroke_width
+
+def dynamic(style):
+    """mark a style function as depending on more than the cell index (t, the
+    cell positions), so that DiagramAnimation calls it on every frame"""
+
+    style.dynamic = True
+    return style
+
+def pixel_size(camera=None):
+    """width of a pixel in scene units, for camera or the render"""
+
+    if camera is None:
+        return config.frame_width / config.pixel_width
+    return camera.frame_width / camera.pixel_width
+
+DUMMY = [(-1, 0, 0), (1, 0, 0), (0, 1.41, 0)]
+
+class DiagramAnimation:
+    """pool of polygons showing the diagram of cells, rebuilt before every
+    frame of play() once cells_updater(t) moved the cells
+
+    style_polygon(i, polygon, t) and style_dot(i, dot, t) style the polygons
+    and dots of the cells i. The pool starts with size (default len(cells))
+    polygons built with polygon_config, unless given as polygons, and the
+    unused ones are hidden then shown again with their previous opacities.
+    A polygon is only styled again when its cell or style function changed
+    or after it was hidden, dots when their style function changed, unless
+    the style is marked as dynamic. diagrams(t) replaces the cached diagram
+    of the cells, e.g. Timeline.frame, and curved polygons with less than
+    min_vertices vertices are hidden.
+
+    The curved edges are cut in as many segments as they need to stay within
+    tolerance, half a pixel by default, and at most options.segments_density
+    (see make_diagram), so that small cells get a few vertices and large ones
+    all of them. The pixel is the one of camera, or of the camera of the scene
+    played in, measured at the start of every play so that it follows zooms.
+    A tolerance of 0 always uses options.segments_density.
+
+    Frames whose fingerprint (the cache key of the cells, bounds and options,
+    or the diagram returned by diagrams) is the same as the previous one keep
+    the polygons and dots where they are, only the styles are checked, and
+    are counted in skipped. The other ones rebuild only the polygons of the
+    cells that moved since the previous frame and of their neighbors (see
+    update_diagram), unless their diagram is cached.
+
+    The pool grows ahead of need when cells split into more polygons, and
+    gives back its extra polygons at the end of the plays that used less than
+    half of it, keeping them aside to be reused. high_water is the most
+    polygons ever shown at once."""
+
+    def __init__(self, bounds, cells, style_polygon=None, style_dot=None,
+                 polygons=None, dots=None, size=None, options=options,
+                 diagrams=None, min_vertices=0, tolerance=None, camera=None, **polygon_config):
+        self.bounds = bounds
+        self.cells = cells
+        self.options = options
+        self.style_polygon, self.style_dot = style_polygon, style_dot
+        self.diagrams = diagrams
+        self.min_vertices = min_vertices
+        self.given_tolerance, self.camera = tolerance, camera
+        self.begin()
+
+        if polygons is None:
+            self.template = Polygon(*DUMMY, **polygon_config)
+            polygons = VGroup(self.template.copy() for _ in range(size or len(cells)))
+        else:
+            self.template = polygons[0].copy()
+        self.polygons = polygons
+        self.dots = VGroup() if dots is None else dots
+
+        self.hidden = [False] * len(polygons)
+        self.opacities = [None] * len(polygons)
+        # (cell, style) each polygon was last styled with, style of each dot
+        self.styled = [None] * len(polygons)
+        self.dots_styled = [None] * len(self.dots)
+        self.spare = []
+        self.high_water = self.peak = 0
+        self.cells_updater = None
+        self.t = ValueTracker(0)
+        # (polygon, cell) pairs shown by the last frame
+        self.shown = []
+        self.fingerprint = None
+        # full diagram of the last frame, updated by the next one
+        self.diagram = None
+        self.frames = self.skipped = 0
+
+    def __repr__(self):
+        return (f'DiagramAnimation({len(self.polygons)} polygons, {len(self.spare)} spare, '
+                f'{self.high_water} at most, {self.skipped}/{self.frames} frames skipped)')
+
+    def resize(self, size):
+        """grow or trim the pool to size polygons, trimmed polygons are the
+        unused ones at the end, they stay hidden until they are reused"""
+
+        n = len(self.polygons)
+        if size > n:
+            for _ in range(size - n):
+                if self.spare:
+                    polygon, hidden, opacities = self.spare.pop()
+                else:
+                    polygon, hidden, opacities = self.template.copy(), False, None
+                self.polygons.add(polygon)
+                self.hidden.append(hidden)
+                self.opacities.append(opacities)
+                self.styled.append(None)
+
+        elif size < n:
+            for k in range(n-1, size-1, -1):
+                self.hide(k)
+                self.spare.append((self.polygons[k], True, self.opacities[k]))
+            self.polygons.remove(*self.polygons.submobjects[size:])
+            del self.hidden[size:], self.opacities[size:], self.styled[size:]
+
+        self.fingerprint = None
+
+    def begin(self, camera=None):
+        """tolerance of the next frames, from the current frame width of
+        self.camera, camera or the render"""
+
+        if self.given_tolerance is not None:
+            self.tolerance = self.given_tolerance
+        else:
+            self.tolerance = pixel_size(self.camera or camera)/2
+        self.fingerprint = None
+
+    def lookup(self, t):
+        """fingerprint of the frame at t and a function returning its diagram,
+        the diagram of the cells is only built when it is needed"""
+
+        if self.diagrams is not None:
+            diagram = self.diagrams(t)
+            return diagram, lambda: diagram
+
+        sites, weights = cells_to_arrays(self.cells)
+        key = diagram_cache.key(self.options, self.bounds, sites, weights, self.tolerance)
+        return key, lambda: diagram_cache.get(self.options, self.bounds, sites, weights, key,
+                                              previous=self.diagram, tolerance=self.tolerance)
+
+    def hide(self, k):
+        if not self.hidden[k]:
+            polygon = self.polygons[k]
+            self.opacities[k] = polygon.get_fill_opacity(), polygon.get_stroke_opacity()
+            polygon.set_opacity(0)
+            self.hidden[k] = True
+            self.styled[k] = None
+
+    def show(self, k):
+        if self.hidden[k]:
+            fill, stroke = self.opacities[k]
+            self.polygons[k].set_fill(opacity=fill).set_stroke(opacity=stroke)
+            self.hidden[k] = False
+
+    def update(self, t=None):
+        t = self.t.get_value() if t is None else t
+        self.frames += 1
+
+        fingerprint, get = self.lookup(t)
+        if fingerprint == self.fingerprint:
+            self.skipped += 1
+            self.restyle(t)
+            return
+
+        diagram = self.diagram = get()
+        if self.min_vertices and is_weighted(getattr(diagram, 'weights', ())):
+            # hard-code hide the leftovers of crushed weighted cells
+            diagram = diagram.select(np.diff(diagram.offsets) >= self.min_vertices)
+
+        used = len(diagram)
+        if used > len(self.polygons):
+            # with some room, so that cells splitting one by one do not grow
+            # the pool on every frame
+            self.resize(used + max(used//4, 2))
+        self.peak = max(self.peak, used)
+        self.high_water = max(self.high_water, used)
+
+        if len(diagram):
+            # all the bezier points of the frame at once, copied in place
+            points, offsets = diagram.beziers(self.polygons[0]._bezier_t_values)
+
+        self.shown = []
+        for k, i in enumerate(diagram.indices):
+            set_points(self.polygons[k], points[offsets[k]:offsets[k+1]])
+            self.show(k)
+            self.shown.append((k, i))
+
+        # hide the unused polygons
+        for k in range(len(diagram), len(self.polygons)):
+            self.hide(k)
 
-    def find(arr, target):
-        for i, elt in enumerate(arr):
-            if np.array_equal(elt, target):
-                return i
+        for i, dot in enumerate(self.dots):
+            u = self.cells[i].pos
+            dot.move_to((u.x, u.y, 0))
 
-        raise IndexError(f'find: {target} not found')
+        self.fingerprint = fingerprint
+        self.restyle(t)
 
-    for center, polygon in zip(dots, polygons):
-        center = center.get_center()
+    def restyle(self, t):
+        style = self.style_polygon
+        if style is not None:
+            dynamic = getattr(style, 'dynamic', False)
+            for k, i in self.shown:
+                if dynamic or self.styled[k] != (i, style):
+                    style(i, self.polygons[k], t)
+                    self.styled[k] = i, style
 
-        # fix the rotation direction
-        a, b = polygon.points[:2]
-        rotated = center-b
-        rotated = np.array([-rotated[1], rotated[0], 0])
-        if np.dot(b-a, rotated) > 0:
-            polygon.points = np.flip(polygon.points)
+        style = self.style_dot
+        if style is not None:
+            dynamic = getattr(style, 'dynamic', False)
+            for i, dot in enumerate(self.dots):
+                if dynamic or self.dots_styled[i] is not style:
+                    style(i, dot, t)
+                    self.dots_styled[i] = style
 
-        # add a margin
-        points = deepcopy(polygon.points)
-        for i, now in enumerate(points):
-            before, after = points[i-1], points[(i+1) % len(points)]
+    def play(self, scene, cells_updater=None, style_polygon=None, style_dot=None, **kwargs):
+        """animate t from 0 to 1 in scene, the callbacks that are given
+        replace the ones of the previous plays"""
 
-            move = after-before
-            move = np.array([-move[1], move[0], move[2]])
-            move *= 1 / np.sqrt(np.sum(move**2))
+        if cells_updater is not None:
+            self.cells_updater = cells_updater
+        if style_polygon is not None:
+            self.style_polygon = style_polygon
+        if style_dot is not None:
+            self.style_dot = style_dot
 
-            polygon.points[i] += move * margin
+        def updater(_):
+            t = self.t.get_value()
+            if self.cells_updater is not None:
+                self.cells_updater(t)
+            self.update(t)
 
-        # remove excess points (that make it go the other way)
-        dist_sort = lambda pos: -np.sum((pos-center)**2)
-        points_l = list(polygon.points)
-        for now in sorted(polygon.points, key=dist_sort):
-            i = find(points_l, now)
-            before = points[i-1]
+        # what timing.describe names the updater after
+        updater.driver = self.cells_updater
 
-            rotated = center-now
-            rotated = np.array([-rotated[1], rotated[0], 0])
-            if np.dot(now-before, rotated) > 0:
-                points_l.pop(i)
+        self.peak = 0
+        self.begin(scene.camera)
+        self.t.set_value(0)
+        self.polygons.add_updater(updater)
+        scene.play(self.t.animate.set_value(1), **kwargs)
+        self.polygons.clear_updaters()
 
-        polygon.points = np.array(points_l)
+        # make sure the last frame of the animation is played
+        updater(None)
 
-options = Options(segments_density=20, divide_lines=True, complete_polygons=False)
+        if 2*self.peak < len(self.polygons):
+            self.resize(self.peak + max(self.peak//4, 2))
 
 number_plane_config = {
         'axis_config': {
@@ -0,0 +1,1053 @@
+"""structure-of-arrays Voronoi diagrams
+
+Sites are an (N, 2) float array with an (N,) weight array, and a diagram is
+one flat vertex array cut into polygons by an offsets array. Unweighted
+diagrams are built by clipping the bounds against the nearest sites, all
+cells at once. Weighted ones (where the distance to a site is its weight
+times the euclidean one) are built cell by cell from the Apollonius circles
+of the few sites that can reach each cell, without going through
+fast_voronoi's per-vertex objects."""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from fast_voronoi import Cell, v2
+
+# neighbors every cell is clipped against in the vectorized pass, the few
+# cells that are not finished by then get the rest of the sites afterwards
+NEAREST = 24
+# max number of pairwise distances held in memory at once
+CHUNK = 1 << 22
+
+def cells_to_arrays(cells):
+    sites = np.array([(cell.pos.x, cell.pos.y) for cell in cells], dtype=float)
+    weights = np.array([cell.weight for cell in cells], dtype=float)
+    return sites.reshape(-1, 2), weights
+
+def arrays_to_cells(sites, weights):
+    return [Cell(v2(x, y), w) for (x, y), w in zip(sites.tolist(), weights.tolist())]
+
+def is_weighted(weights):
+    return len(weights) > 0 and not np.all(weights == weights[0])
+
+class Diagram:
+    """polygon k belongs to the cell indices[k] and is made of the vertices
+    vertices[offsets[k]:offsets[k+1]]
+
+    labels, when known, give for each vertex the cell on the other side of the
+    edge that starts at that vertex (-1 for the bounds)"""
+
+    def __init__(self, indices, vertices, offsets, labels=None):
+        self.indices = indices
+        self.vertices = vertices
+        self.offsets = offsets
+        self.labels = labels
+        self._points3 = self._beziers = None
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, k):
+        return self.indices[k], self.vertices[self.offsets[k]:self.offsets[k+1]]
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    def points3(self):
+        """vertices as one contiguous (M, 3) float array, to be sliced with
+        offsets for manim, computed once per diagram"""
+
+        if self._points3 is None:
+            self._points3 = np.zeros((len(self.vertices), 3))
+            self._points3[:, :2] = self.vertices
+        return self._points3
+
+    def polygons3(self):
+        """(i, points) pairs like make_polygons, with (k, 3) views of points3"""
+        points = self.points3()
+        for k, i in enumerate(self.indices):
+            yield i, points[self.offsets[k]:self.offsets[k+1]]
+
+    def beziers(self, t_values):
+        """bezier points of every polygon taken as corners, all at once, as
+        manim's set_points_as_corners (cubic curves with handles at t_values,
+        path not closed): returns the (B, 3) points and the offsets of each
+        polygon in them, computed once per diagram"""
+
+        key = tuple(t_values)
+        if self._beziers is None or self._beziers[0] != key:
+            points, offsets = self.points3(), np.asarray(self.offsets)
+            n = len(t_values)
+            # every corner but the last of its polygon starts a curve
+            starts = np.ones(len(points), dtype=bool)
+            starts[offsets[1:][np.diff(offsets) > 0] - 1] = False
+            start = points[starts]
+            end = points[np.flatnonzero(starts) + 1]
+
+            curves = np.empty((len(start), n, 3))
+            for k, t in enumerate(t_values):
+                curves[:, k] = (1-t)*start + t*end
+
+            counts = np.maximum(np.diff(offsets) - 1, 0)
+            bezier_offsets = np.zeros(len(offsets), dtype=np.intp)
+            np.cumsum(counts * n, out=bezier_offsets[1:])
+            self._beziers = key, curves.reshape(-1, 3), bezier_offsets
+
+        return self._beziers[1:]
+
+    def select(self, keep):
+        """diagram of the polygons k where keep[k] is set"""
+
+        if np.all(keep):
+            return self
+        counts = np.diff(self.offsets)[keep]
+        offsets = np.zeros(len(counts)+1, dtype=np.intp)
+        np.cumsum(counts, out=offsets[1:])
+        vertex_keep = np.repeat(keep, np.diff(self.offsets))
+        return Diagram(self.indices[keep], self.vertices[vertex_keep], offsets,
+                       None if self.labels is None else self.labels[vertex_keep])
+
+def _nearest(sites, rows, k):
+    """k nearest sites of each row, closest first, with their squared distances
+    and a lower bound on the squared distance of all the other sites"""
+
+    n = len(sites)
+    nbrs = np.empty((len(rows), k), dtype=np.intp)
+    dist = np.empty((len(rows), k))
+    step = max(1, CHUNK // n)
+
+    for a in range(0, len(rows), step):
+        chunk = rows[a:a+step]
+        d = np.sum((sites[chunk, None] - sites[None]) ** 2, axis=-1)
+        d[np.arange(len(chunk)), chunk] = np.inf
+
+        near = np.argpartition(d, k-1, axis=1)[:, :k]
+        d = np.take_along_axis(d, near, 1)
+        order = d.argsort(axis=1, kind='stable')
+        nbrs[a:a+len(chunk)] = np.take_along_axis(near, order, 1)
+        dist[a:a+len(chunk)] = np.take_along_axis(d, order, 1)
+
+    limit = dist[:, -1] if k < n-1 else np.full(len(rows), np.inf)
+    return nbrs, dist, limit
+
+def _grid_nearest(sites, rows, reach=3):
+    """same as _nearest, but only looking at the sites binned in the
+    (2*reach+1)**2 grid squares around each row (one site per square on
+    average), so that large diagrams never compute all the pairwise distances"""
+
+    n = len(sites)
+    low, high = sites.min(axis=0), sites.max(axis=0)
+    size = max(np.sqrt(np.prod(high-low + 1e-12) / n), 1e-12)
+    shape = np.floor((high-low) / size).astype(np.intp) + 1
+
+    ij = np.minimum(((sites-low) / size).astype(np.intp), shape-1)
+    key = ij[:, 0]*shape[1] + ij[:, 1]
+    order = np.argsort(key, kind='stable')
+    starts = np.searchsorted(key[order], np.arange(shape[0]*shape[1]+1))
+
+    fill = np.diff(starts).max()
+    width = fill * (2*reach+1)**2
+    if width > 32*NEAREST:
+        # too clustered for the grid to help
+        return _nearest(sites, rows, min(n-1, NEAREST))
+
+    k = min(width, 4*NEAREST)
+    nbrs = np.empty((len(rows), k), dtype=np.intp)
+    dist = np.empty((len(rows), k))
+    step = max(1, CHUNK // width)
+
+    offsets = np.arange(-reach, reach+1)
+    di, dj = (a.ravel() for a in np.meshgrid(offsets, offsets, indexing='ij'))
+    for a in range(0, len(rows), step):
+        chunk = rows[a:a+step]
+        ci, cj = ij[chunk, 0, None] + di, ij[chunk, 1, None] + dj
+        inside = (ci >= 0) & (ci < shape[0]) & (cj >= 0) & (cj < shape[1])
+        square = np.where(inside, ci*shape[1] + cj, 0)
+
+        slot = np.where(inside, starts[square], 0)[..., None] + np.arange(fill)
+        used = slot < np.where(inside, starts[square+1], 0)[..., None]
+        cand = np.where(used, order[np.minimum(slot, n-1)], chunk[:, None, None])
+        cand = cand.reshape(len(chunk), -1)
+
+        d = np.sum((sites[cand] - sites[chunk, None]) ** 2, axis=-1)
+        d[cand == chunk[:, None]] = np.inf
+        # the rare cells that need more than k sites are left to _nearest
+        near = d.argsort(axis=1, kind='stable')[:, :k]
+        nbrs[a:a+len(chunk)] = np.take_along_axis(cand, near, 1)
+        dist[a:a+len(chunk)] = np.take_along_axis(d, near, 1)
+
+    # sites outside of the squares are at least as far as their border,
+    # except on the sides where the squares go past the grid
+    pos = sites[rows] - low
+    first, last = ij[rows] - reach, ij[rows] + reach+1
+    border = np.minimum(np.where(first > 0, pos - first*size, np.inf),
+                        np.where(last < shape, last*size - pos, np.inf))
+    limit = np.minimum(border.min(axis=1) ** 2, dist[:, -1])
+    return nbrs, dist, limit
+
+def _clip(poly, count, labels, normal, offset, label):
+    """one Sutherland-Hodgman step, clipping every polygon against its own
+    half-plane normal.x <= offset (a null normal with offset > 0 keeps it)"""
+
+    n, width = poly.shape[:2]
+    idx = np.arange(width)
+    valid = idx < count[:, None]
+    after = np.where(idx+1 < count[:, None], idx+1, 0)
+
+    da = np.einsum('nvk,nk->nv', poly, normal) - offset[:, None]
+    db = np.take_along_axis(da, after, 1)
+    a_in, b_in = da <= 0, db <= 0
+    cross = valid & (a_in != b_in)
+
+    b = np.take_along_axis(poly, after[..., None], 1)
+    t = np.divide(da, da-db, out=np.zeros_like(da), where=cross)
+    inter = poly + t[..., None] * (b-poly)
+
+    # leaving the half-plane follows the clipping line, entering it follows
+    # the edge that was cut
+    inter_labels = np.where(a_in, label[:, None], labels)
+
+    out = np.stack((poly, inter), axis=2).reshape(n, 2*width, 2)
+    out_labels = np.stack((labels, inter_labels), axis=2).reshape(n, 2*width)
+    keep = np.stack((valid & a_in, cross), axis=2).reshape(n, 2*width)
+
+    count = keep.sum(axis=1)
+    order = np.argsort(~keep, axis=1, kind='stable')[:, :max(count.max(), 1)]
+    return (np.take_along_axis(out, order[..., None], 1), count,
+            np.take_along_axis(out_labels, order, 1))
+
+def _clip_cells(sites, rows, near, poly, count, labels):
+    """clip the cells of rows against their sorted neighbors near, as returned
+    by _nearest, until the security radius shows that the remaining sites
+    cannot reach them, returns the new polygons and which rows are finished"""
+
+    nbrs, dist, limit = near
+    sq = np.sum(sites**2, axis=1)
+    done = np.zeros(len(rows), dtype=bool)
+    finished = []
+
+    # only the unfinished rows are carried from one rank to the next
+    work = np.arange(len(rows))
+    for rank in range(nbrs.shape[1]):
+        pos = sites[rows[work]]
+        j = nbrs[work, rank]
+
+        valid = np.arange(poly.shape[1]) < count[:, None]
+        radius = np.where(valid, np.sum((poly - pos[:, None]) ** 2, axis=-1), 0)
+        safe = 4*radius.max(axis=1) <= np.minimum(dist[work, rank], limit[work])
+
+        if safe.any():
+            finished.append((work[safe], poly[safe], count[safe], labels[safe]))
+            done[work[safe]] = True
+            keep = ~safe
+            work, poly, count, labels, pos, j = (a[keep] for a in (work, poly, count, labels, pos, j))
+            if not len(work):
+                break
+
+        active = np.isfinite(dist[work, rank])
+        normal = np.where(active[:, None], sites[j] - pos, 0)
+        offset = np.where(active, (sq[j] - sq[rows[work]]) / 2, 1)
+        poly, count, labels = _clip(poly, count, labels, normal, offset, j)
+
+    if len(work):
+        done[work] = np.isinf(limit[work])
+        finished.append((work, poly, count, labels))
+
+    width = max(part[1].shape[1] for part in finished)
+    poly = np.zeros((len(rows), width, 2))
+    count = np.zeros(len(rows), dtype=np.intp)
+    labels = np.full((len(rows), width), -1, dtype=np.intp)
+    for at, part_poly, part_count, part_labels in finished:
+        poly[at, :part_poly.shape[1]] = part_poly
+        count[at] = part_count
+        labels[at, :part_labels.shape[1]] = part_labels
+
+    return poly, count, labels, done
+
+def _unweighted(options, bounds, sites, rows=None):
+    """polygons of the cells in rows (all of them by default), as padded
+    arrays (poly, count, labels)"""
+
+    n = len(sites)
+    rows = np.arange(n) if rows is None else np.asarray(rows, dtype=np.intp)
+
+    _, first, inverse = np.unique(sites, axis=0, return_index=True, return_inverse=True)
+    if len(first) < n:
+        # the copies of a site have empty cells, like in _weighted, the first
+        # one gets the whole cell
+        own = first[inverse.ravel()[rows]] == rows
+        sub = _unweighted(options, bounds, sites[first], inverse.ravel()[rows[own]])
+        poly = np.zeros((len(rows),) + sub[0].shape[1:])
+        count = np.zeros(len(rows), dtype=np.intp)
+        labels = np.full((len(rows), sub[2].shape[1]), -1, dtype=np.intp)
+        poly[own], count[own] = sub[0], sub[1]
+        labels[own] = np.where(sub[2] >= 0, first[sub[2]], -1)
+        return poly, count, labels
+
+    box = np.array([(bounds.left, bounds.top), (bounds.right, bounds.top),
+                    (bounds.right, bounds.bottom), (bounds.left, bounds.bottom)])
+    poly = np.tile(box, (len(rows), 1, 1))
+    count = np.full(len(rows), 4)
+    labels = np.full((len(rows), 4), -1, dtype=np.intp)
+    if n < 2:
+        return poly, count, labels
+
+    k = min(n-1, NEAREST)
+    if n*n <= CHUNK:
+        near = _nearest(sites, rows, k)
+    else:
+        near = _grid_nearest(sites, rows)
+        k = near[0].shape[1]
+    poly, count, labels, done = _clip_cells(sites, rows, near, poly, count, labels)
+
+    # the cells left over are usually on the bounds, far from their sites
+    left = np.flatnonzero(~done)
+    while len(left):
+        k = min(n-1, 4*k)
+        sub = _clip_cells(sites, rows[left], _nearest(sites, rows[left], k),
+                          poly[left], count[left], labels[left])
+
+        width = max(poly.shape[1], sub[0].shape[1])
+        poly = np.pad(poly, ((0, 0), (0, width-poly.shape[1]), (0, 0)))
+        labels = np.pad(labels, ((0, 0), (0, width-labels.shape[1])))
+        poly[left, :sub[0].shape[1]], count[left] = sub[0], sub[1]
+        labels[left, :sub[2].shape[1]] = sub[2]
+        left = left[~sub[3]]
+
+    return poly, count, labels
+
+def _pack(options, bounds, rows, poly, count, labels):
+    """flatten padded polygons into a Diagram, dropping degenerate edges and
+    empty cells"""
+
+    width = poly.shape[1]
+    idx = np.arange(width)
+    valid = idx < count[:, None]
+    after = np.where(idx+1 < count[:, None], idx+1, 0)
+
+    # a vertex whose outgoing edge has no length is dropped, the next one
+    # carries the label of the edge that actually follows
+    eps = 1e-9 * max(bounds.w, bounds.h)
+    length = np.sum((np.take_along_axis(poly, after[..., None], 1) - poly) ** 2, axis=-1)
+    valid &= length > eps*eps
+
+    count = valid.sum(axis=1)
+    keep = count >= 3
+    valid &= keep[:, None]
+    count = count[keep]
+
+    vertices, vertex_labels = poly[valid], labels[valid]
+    offsets = np.zeros(len(count)+1, dtype=np.intp)
+    np.cumsum(count, out=offsets[1:])
+
+    segments = max(1, int(options.segments_density))
+    if options.divide_lines and segments > 1:
+        vertices, offsets, vertex_labels = _divide(vertices, offsets, vertex_labels, segments)
+    if options.complete_polygons:
+        vertices, offsets, vertex_labels = _complete(vertices, offsets, vertex_labels)
+
+    return Diagram(np.asarray(rows)[keep], vertices, offsets, vertex_labels)
+
+def _divide(vertices, offsets, labels, n):
+    """cut every edge of the polygons in n segments, the new vertices take the
+    label of their edge"""
+
+    nxt, _ = _ring(offsets)
+    t = np.arange(n) / n
+    points = vertices[:, None] + t[:, None] * (vertices[nxt] - vertices)[:, None]
+    return points.reshape(-1, 2), offsets*n, np.repeat(labels, n)
+
+def _complete(vertices, offsets, labels):
+    """repeat the first vertex of every polygon at its end"""
+
+    count = np.diff(offsets)
+    order = np.insert(np.arange(len(vertices)), offsets[1:], offsets[:-1])
+    return vertices[order], offsets + np.arange(len(count)+1), labels[order]
+
+def _close_groups(points, tol):
+    """group of every (M, 2) point, the points closer than tol to a point of a
+    group (along both axes) being in that group"""
+
+    m = len(points)
+    order = np.lexsort((points[:, 1], points[:, 0]))
+    x, y = points[order, 0], points[order, 1]
+
+    a, b = [], []
+    for shift in range(1, m):
+        near = x[shift:] - x[:-shift] <= tol
+        if not near.any():
+            break
+        near &= np.abs(y[shift:] - y[:-shift]) <= tol
+        a.append(np.flatnonzero(near))
+        b.append(a[-1] + shift)
+
+    group = np.arange(m)
+    if a:
+        a, b = np.concatenate(a), np.concatenate(b)
+        # spread the smallest index over the close pairs until it settles
+        while True:
+            low = np.minimum(group[a], group[b])
+            if np.array_equal(low, group[a]) and np.array_equal(low, group[b]):
+                break
+            np.minimum.at(group, a, low)
+            np.minimum.at(group, b, low)
+
+    ids = np.empty(m, dtype=np.intp)
+    ids[order] = np.unique(group, return_inverse=True)[1]
+    return ids
+
+def _curves(sites, weights, i, others, box):
+    """curves A|x|² + B.x + C = 0 bounding cell i, the cell being where all of
+    them are <= 0: one per site j of others (w_i²|x-p_i|² <= w_j²|x-p_j|², a
+    circle, or a line for equal weights), then the sides of box. They are
+    scaled to a unit gradient on the curve, so that they read as distances
+    near it. Returns (A, B, C, site of each curve or -1 for the sides), or
+    None if the cell is empty."""
+
+    p, q = sites[i], sites[others]
+    wi2, wj2 = weights[i]**2, weights[others]**2
+    A = wi2 - wj2
+    B = -2*(wi2*p - wj2[:, None]*q)
+    C = wi2*(p @ p) - wj2*np.einsum('ij,ij->i', q, q)
+
+    line = np.abs(A) <= 1e-12*(wi2 + wj2)
+    A = np.where(line, 0, A)
+    safe = np.where(line, 1, A)
+    center = -B / (2*safe[:, None])
+    r2 = np.einsum('ij,ij->i', center, center) - C/safe
+    norm = np.where(line, np.hypot(B[:, 0], B[:, 1]), 2*np.abs(A)*np.sqrt(np.abs(r2)))
+
+    # a circle with no radius is nowhere inside and everywhere outside, the
+    # copies of a site only keep the first one
+    point = ~line & (r2 <= 0)
+    if np.any(point & (A > 0)) or np.any(line & (norm == 0) & (others < i)):
+        return None
+    kept = ~point & (norm > 0)
+    # the copies of a site give the same curve
+    copies = np.column_stack((q, wj2))
+    kept[np.setdiff1d(np.arange(len(q)), np.unique(copies, axis=0, return_index=True)[1])] = False
+
+    (x0, y0), (x1, y1) = box
+    sides = np.array([(0, -1, 0, x0), (0, 0, -1, y0), (0, 1, 0, -x1), (0, 0, 1, -y1)])
+    norm = norm[kept]
+    return (np.r_[A[kept]/norm, sides[:, 0]],
+            np.r_[B[kept]/norm[:, None], sides[:, 1:3]],
+            np.r_[C[kept]/norm, sides[:, 3]],
+            np.r_[others[kept], [-1]*4])
+
+def _values(A, B, C, points):
+    """(M, K) values of the K curves at the M points"""
+    return A*np.einsum('ij,ij->i', points, points)[:, None] + points @ B.T + C
+
+def _within(A, B, C, points, tol, first=16):
+    """which points are inside all the curves (see _curves), the first ones
+    (the closest sites) and the sides ruling out most of them before the
+    others are checked"""
+
+    head = np.r_[np.arange(min(first, len(A)-4)), np.arange(len(A)-4, len(A))]
+    ok = _values(A[head], B[head], C[head], points).max(axis=1) <= tol
+    rest = np.setdiff1d(np.arange(len(A)), head)
+    if len(rest) and ok.any():
+        ok[ok] = _values(A[rest], B[rest], C[rest], points[ok]).max(axis=1) <= tol
+    return ok
+
+def _corners(A, B, C):
+    """intersections of every pair of curves, as (M, 2) points and the two
+    curves of each"""
+
+    a, b = np.triu_indices(len(A), 1)
+
+    # only the pairs that can meet are solved: circles no farther apart than
+    # their radii, lines no farther from the circles than their radius
+    circle = A != 0
+    safe = np.where(circle, A, 1)
+    center = -B / (2*safe[:, None])
+    radius = 1 / (2*np.abs(safe))
+    both, one = circle[a] & circle[b], circle[a] != circle[b]
+    gap = np.hypot(*(center[a] - center[b]).T)
+    c, l = np.where(circle[a], a, b), np.where(circle[a], b, a)
+    slack = 1e-6*(radius[a]*circle[a] + radius[b]*circle[b] + 1)
+    meet = np.where(both, (gap <= radius[a] + radius[b] + slack)
+                    & (gap >= np.abs(radius[a] - radius[b]) - slack),
+                    ~one | (np.abs(np.einsum('ij,ij->i', B[l], center[c]) + C[l])
+                            <= radius[c] + slack))
+    a, b = a[meet], b[meet]
+    A1, B1, C1, A2, B2, C2 = A[a], B[a], C[a], A[b], B[b], C[b]
+
+    # two lines
+    det = _cross(B1, B2)
+    lines = (A1 == 0) & (A2 == 0) & (np.abs(det) > 1e-12)
+    safe = np.where(lines, det, 1)
+    crossing = np.column_stack(((C2*B1[:, 1] - C1*B2[:, 1]) / safe,
+                                (C1*B2[:, 0] - C2*B1[:, 0]) / safe))[lines]
+
+    # a circle and the radical line of both curves (the line itself for a
+    # line and a circle), at p + t*d
+    n = A2[:, None]*B1 - A1[:, None]*B2
+    e = A2*C1 - A1*C2
+    nn = np.einsum('ij,ij->i', n, n)
+    ok = ((A1 != 0) | (A2 != 0)) & (nn > 1e-24)
+    first = (A1 != 0)[:, None]
+    Aq, Bq, Cq = np.where(first[:, 0], A1, A2), np.where(first, B1, B2), np.where(first[:, 0], C1, C2)
+    nn = np.where(ok, nn, 1)
+    p = -e[:, None]*n / nn[:, None]
+    d = np.column_stack((-n[:, 1], n[:, 0])) / np.sqrt(nn)[:, None]
+
+    qa = np.where(ok, Aq, 1)
+    qb = 2*Aq*np.einsum('ij,ij->i', p, d) + np.einsum('ij,ij->i', Bq, d)
+    qc = Aq*np.einsum('ij,ij->i', p, p) + np.einsum('ij,ij->i', Bq, p) + Cq
+    disc = qb*qb - 4*qa*qc
+    # tangent curves rounded apart still meet
+    ok &= disc >= -1e-9*qb*qb
+    root = np.sqrt(np.maximum(disc, 0))
+    t = np.stack(((-qb - root) / (2*qa), (-qb + root) / (2*qa)))
+    meeting = (p + t[..., None]*d)[:, ok].reshape(-1, 2)
+
+    return (np.concatenate((crossing, meeting)),
+            np.r_[a[lines], a[ok], a[ok]], np.r_[b[lines], b[ok], b[ok]])
+
+def _inside(point, polygon):
+    """whether point is inside polygon (even-odd rule)"""
+
+    a, b = polygon, np.roll(polygon, -1, axis=0)
+    crosses = (a[:, 1] > point[1]) != (b[:, 1] > point[1])
+    t = (point[1] - a[:, 1]) / np.where(crosses, b[:, 1] - a[:, 1], 1)
+    return np.count_nonzero(crosses & (point[0] < a[:, 0] + t*(b[:, 0] - a[:, 0]))) % 2 == 1
+
+def _weighted_cell(options, i, curves, tol, tolerance=None):
+    """polygons of one weighted cell from its curves (see _curves), as a list
+    of (vertices, labels), and the corners low, high of its bounding box: its
+    edges are the pieces of the curves between their intersections that are
+    on the boundary of the cell, chained around it with the cell on their
+    left, and every hole is joined to the polygon around it by a bridge
+
+    The arcs are cut in options.segments_density segments or, if tolerance is
+    given, in just enough of them for their chords to stay within tolerance
+    of the arc, at least 3 so that a cell bounded by one arc stays a polygon."""
+
+    A, B, C, owner = curves
+    points, ca, cb = _corners(A, B, C)
+    valid = _within(A, B, C, points, tol)
+    points, ca, cb = points[valid], ca[valid], cb[valid]
+
+    # every corner on both of its curves, plus a point on the circles that
+    # have none, in case they are whole edges
+    circle = A != 0
+    safe = np.where(circle, A, 1)
+    center = -B / (2*safe[:, None])
+    radius = 1 / (2*np.abs(safe))
+    lone = np.setdiff1d(np.flatnonzero(circle), np.r_[ca, cb])
+    curve = np.r_[ca, cb, lone]
+    at = np.concatenate((points, points, center[lone] + radius[lone, None]*(1, 0)))
+
+    # position along the curve, increasing with the cell on the left: the
+    # angle around the circles the cell is inside, minus it for the others
+    direction = np.column_stack((-B[:, 1], B[:, 0]))
+    rel = at - center[curve]
+    angle = np.arctan2(rel[:, 1], rel[:, 0]) * np.sign(A[curve])
+    u = np.where(circle[curve], angle, np.einsum('ij,ij->i', at, direction[curve]))
+
+    order = np.lexsort((u, curve))
+    curve, u, at = curve[order], u[order], at[order]
+    same = np.abs(at[1:] - at[:-1]).max(axis=1, initial=0) <= tol
+    keep = np.r_[True, (curve[1:] != curve[:-1]) | ~same]
+    curve, u, at = curve[keep], u[keep], at[keep]
+
+    m = len(curve)
+    idx = np.arange(m)
+    first = np.r_[True, curve[1:] != curve[:-1]]
+    last = np.r_[curve[1:] != curve[:-1], True]
+    head = np.maximum.accumulate(np.where(first, idx, 0))
+    # the same corner on both sides of the angle cut
+    wrap = last & ~first & (np.abs(at - at[head]).max(axis=1, initial=0) <= tol)
+    if wrap.any():
+        curve, u, at = curve[~wrap], u[~wrap], at[~wrap]
+        m, idx = len(curve), np.arange(len(curve))
+        first = np.r_[True, curve[1:] != curve[:-1]]
+        last = np.r_[curve[1:] != curve[:-1], True]
+        head = np.maximum.accumulate(np.where(first, idx, 0))
+
+    nxt = np.where(last, head, idx+1)
+    end = u[nxt] + np.where(last, 2*np.pi, 0)
+    piece = (~last | circle[curve]) & (end - u > 0)
+
+    mid = (u + end) / 2
+    mid_points = np.where(circle[curve, None],
+                          center[curve] + radius[curve, None]*np.column_stack(
+                              (np.cos(mid*np.sign(A[curve])), np.sin(mid*np.sign(A[curve])))),
+                          at + (mid - u)[:, None]*direction[curve])
+    piece &= _within(A, B, C, mid_points, tol)
+    edges = np.flatnonzero(piece)
+    if not len(edges):
+        return [], None, None
+
+    # bounding box of the cell: the corners, and the points of the arcs
+    # facing the axes when the arcs go through them
+    c = curve[edges]
+    side = np.arange(4)*np.pi/2
+    through = circle[c, None] & (np.mod(side*np.sign(A[c, None]) - u[edges, None], 2*np.pi)
+                                 <= (end[edges] - u[edges])[:, None])
+    extreme = center[c, None] + radius[c, None, None]*np.column_stack((np.cos(side), np.sin(side)))
+    extent = np.concatenate((at[edges], extreme[through]))
+    low, high = extent.min(axis=0), extent.max(axis=0)
+
+    # the edges as polylines, circles and divided lines cut in segments
+    segments = max(1, int(options.segments_density))
+    count = np.where(circle[c] | options.divide_lines, segments, 1)
+    if tolerance:
+        # the sagitta r*(1 - cos(step/2)) of the chords is at most tolerance
+        cos = np.clip(1 - tolerance/radius[c], -1, 1)
+        step = 2*np.arccos(cos)
+        needed = np.ceil((end[edges] - u[edges]) / np.where(step > 0, step, 1))
+        needed = np.where(step > 0, np.maximum(needed, 3), segments)
+        count = np.where(circle[c], np.minimum(needed, segments), count).astype(np.intp)
+    offsets = np.r_[0, np.cumsum(count)]
+    e = np.repeat(edges, count)
+    step = np.arange(offsets[-1]) - np.repeat(offsets[:-1], count)
+    v = u[e] + (end[e] - u[e]) * step / np.repeat(count, count)
+    k = curve[e]
+    angle = v*np.sign(A[k])
+    vertices = np.where(circle[k, None],
+                        center[k] + radius[k, None]*np.column_stack((np.cos(angle), np.sin(angle))),
+                        at[e] + (v - u[e])[:, None]*direction[k])
+    vertices[offsets[:-1]] = at[edges]
+    labels = owner[k]
+
+    # chain the edges by their ends
+    ends = _close_groups(np.concatenate((at[edges], at[nxt[edges]])), tol)
+    start, stop = ends[:len(edges)], ends[len(edges):]
+    outgoing = {}
+    for f, s in enumerate(start.tolist()):
+        outgoing.setdefault(s, []).append(f)
+
+    used = np.zeros(len(edges), dtype=bool)
+    outer, holes = [], []
+    for f in range(len(edges)):
+        loop = []
+        while f is not None and not used[f]:
+            used[f] = True
+            loop.append(f)
+            f = next((g for g in outgoing.get(stop[f], ()) if not used[g]), None)
+        if not loop:
+            continue
+
+        ids = np.concatenate([np.arange(offsets[f], offsets[f+1]) for f in loop])
+        if len(ids) < 3:
+            continue
+        poly = vertices[ids]
+        area = np.sum(_cross(poly, np.roll(poly, -1, axis=0)))
+        (outer if area > 0 else holes).append((poly, labels[ids]))
+
+    # bridge every hole to the closest vertex of the polygon around it
+    for hole, hole_labels in holes:
+        for k, (poly, poly_labels) in enumerate(outer):
+            if _inside(hole[0], poly):
+                dist = np.sum((poly[:, None] - hole[None]) ** 2, axis=-1)
+                a, b = np.unravel_index(dist.argmin(), dist.shape)
+                ring = np.r_[np.arange(b, len(hole)), np.arange(b+1)]
+                outer[k] = (np.concatenate((poly[:a+1], hole[ring], poly[a:])),
+                            np.concatenate((poly_labels[:a], [i], hole_labels[ring[:-1]], [i],
+                                            poly_labels[a:])))
+                break
+
+    return outer, low, high
+
+def _reaching(sites, weights, i, others, low, high, tol):
+    """which sites of others can cut the cell of site i inside the box from
+    low to high: the heavier ones whose disk (where they beat i) meets the
+    box, the lighter ones whose disk around i (where i beats them) does not
+    hold all of the box, and the equal ones whose bisector cuts it"""
+
+    p, q = sites[i], sites[others]
+    wi2, wj2 = weights[i]**2, weights[others]**2
+    d = np.hypot(*(q - p).T)
+    line = np.abs(wi2 - wj2) <= 1e-12*(wi2 + wj2)
+    den = np.where(line, 1, wj2 - wi2)
+    center = (wj2[:, None]*q - wi2*p) / den[:, None]
+    radius = np.sqrt(wi2*wj2) * d / np.abs(den)
+
+    corners = np.array([low, (low[0], high[1]), high, (high[0], low[1])])
+    nearest = np.hypot(*(np.clip(center, low, high) - center).T)
+    farthest = np.sqrt(np.max(np.sum((corners[:, None] - center) ** 2, axis=-1), axis=0))
+    side = np.max(np.einsum('kij,ij->ki', corners[:, None] - (p+q)/2, q - p), axis=0)
+
+    slack = tol + 1e-9*radius
+    return np.where(line, side >= -tol*d,
+                    np.where(wj2 > wi2, nearest <= radius + slack, farthest >= radius - slack))
+
+def _weighted_cells(options, sites, weights, box, tol, tolerance=None, start=16):
+    """(i, polygons) of every weighted cell, see _weighted_cell
+
+    Each cell is first built from its start closest sites (weighted distance),
+    found among the euclidean nearest neighbors like in _unweighted. Once the
+    cell is known to be inside a box reaching rho away from site i, a site at
+    distance d can only cut it if w_j (d - rho) <= w_i rho and its curve
+    crosses the box (see _reaching): the sites passing these tests are added
+    and the cell is built again, until none is missing. The sites used are
+    never dropped, the parts of the cell they cut off may be outside of the
+    box. The cells reaching past their neighbors look at the sites
+    of the vertical strip they can reach."""
+
+    n = len(sites)
+    rows = np.arange(n)
+    if n < 2:
+        nbrs, dist, limit = np.zeros((n, 0), dtype=np.intp), np.zeros((n, 0)), np.full(n, np.inf)
+    elif n*n <= CHUNK:
+        nbrs, dist, limit = _nearest(sites, rows, min(n-1, NEAREST))
+    else:
+        nbrs, dist, limit = _grid_nearest(sites, rows)
+    wmin = weights.min()
+    by_x = np.argsort(sites[:, 0], kind='stable')
+    xs = sites[by_x, 0]
+
+    for i in rows:
+        pool, d = nbrs[i], np.sqrt(dist[i])
+        pool, d = pool[np.isfinite(d)], d[np.isfinite(d)]
+        # closest first (see _within), the copies of a site in index order
+        closeness = np.zeros(n)
+        closeness[pool] = weights[pool]*d
+        others = pool[np.lexsort((pool, closeness[pool]))][:start]
+
+        while True:
+            curves = _curves(sites, weights, i, others, box)
+            polygons, low, high = ([], None, None) if curves is None else \
+                    _weighted_cell(options, i, curves, tol, tolerance)
+            if not polygons:
+                break
+
+            rho = np.sqrt(np.sum(np.maximum(np.abs(low - sites[i]), np.abs(high - sites[i]))**2))
+            reach = rho*(1 + weights[i]/wmin)*(1 + 1e-9) + tol
+            if reach**2 > limit[i]:
+                # the sites in the vertical strip the cell can reach
+                x = sites[i, 0]
+                pool = by_x[np.searchsorted(xs, x - reach):np.searchsorted(xs, x + reach, 'right')]
+                pool = pool[pool != i]
+                d = np.sqrt(np.sum((sites[pool] - sites[i]) ** 2, axis=1))
+                limit[i] = reach**2
+            ok = d <= rho*(1 + weights[i]/weights[pool])*(1 + 1e-9) + tol
+            ok[ok] = _reaching(sites, weights, i, pool[ok], low, high, tol)
+            ok[ok] = ~np.isin(pool[ok], others)
+            if not ok.any():
+                break
+
+            # at most twice as many sites per build, the closest first
+            closeness[pool] = weights[pool]*d
+            new = pool[ok][np.lexsort((pool[ok], closeness[pool[ok]]))][:max(len(others), start)]
+            others = np.r_[others, new]
+            others = others[np.lexsort((others, closeness[others]))]
+
+        yield i, polygons
+
+def _weighted(options, bounds, sites, weights, tolerance=None):
+    """weighted diagram, every cell being clipped by the Apollonius circles
+    of the sites that can reach it"""
+
+    box = np.array([(bounds.left, bounds.top), (bounds.right, bounds.bottom)])
+    scale = max(bounds.w, bounds.h, np.abs(box).max())
+    tol = 1e-9 * scale
+
+    indices, polygons, labels = [], [], []
+    for i, cell in _weighted_cells(options, sites, weights, box, tol, tolerance):
+        for poly, poly_labels in cell:
+            indices.append(i)
+            polygons.append(poly)
+            labels.append(poly_labels)
+
+    offsets = np.zeros(len(polygons)+1, dtype=np.intp)
+    np.cumsum([len(p) for p in polygons], out=offsets[1:])
+    vertices = np.concatenate(polygons) if polygons else np.zeros((0, 2))
+    labels = np.concatenate(labels).astype(np.intp) if labels else np.zeros(0, dtype=np.intp)
+    if options.complete_polygons:
+        vertices, offsets, labels = _complete(vertices, offsets, labels)
+    return Diagram(np.array(indices, dtype=np.intp), vertices, offsets, labels)
+
+def make_diagram(options, bounds, sites, weights, tolerance=None):
+    """array counterpart of make_polygons(options, bounds, cells)
+
+    Like make_polygons, the curved edges are cut in options.segments_density
+    segments, the straight ones too if options.divide_lines is set. Given a
+    tolerance, e.g. the size of a pixel, the curved edges get fewer segments
+    when that is enough for their chords to stay within it (see
+    _weighted_cell)."""
+
+    if is_weighted(weights):
+        diagram = _weighted(options, bounds, sites, weights, tolerance)
+    else:
+        rows = np.arange(len(sites))
+        diagram = _pack(options, bounds, rows, *_unweighted(options, bounds, sites))
+
+    return _stamp(diagram, bounds, sites, weights)
+
+def diagram_from_cells(options, bounds, cells):
+    return make_diagram(options, bounds, *cells_to_arrays(cells))
+
+def _stamp(diagram, bounds, sites, weights):
+    # remember what the diagram was built from, for update_diagram
+    diagram.bounds = (bounds.left, bounds.top, bounds.w, bounds.h)
+    diagram.sites, diagram.weights = sites.copy(), weights.copy()
+    return diagram
+
+def _merge(diagram, rebuilt, parts):
+    """diagram with the polygons of the cells in rebuilt replaced by the ones
+    in parts, still sorted by cell"""
+
+    keep = ~np.isin(diagram.indices, rebuilt)
+    counts = np.diff(diagram.offsets)
+    vertex_keep = np.repeat(keep, counts)
+
+    parts = [Diagram(diagram.indices[keep], diagram.vertices[vertex_keep],
+                     np.r_[0, np.cumsum(counts[keep])], diagram.labels[vertex_keep])] + parts
+    indices = np.concatenate([part.indices for part in parts])
+    counts = np.concatenate([np.diff(part.offsets) for part in parts])
+    vertices = np.concatenate([part.vertices for part in parts])
+    labels = np.concatenate([part.labels for part in parts])
+
+    order = np.argsort(indices, kind='stable')
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    offsets = np.r_[0, np.cumsum(counts[order])]
+    gather = np.repeat(starts[order] - offsets[:-1], counts[order]) + np.arange(offsets[-1])
+
+    return Diagram(indices[order], vertices[gather], offsets, labels[gather])
+
+def update_diagram(options, bounds, diagram, sites, weights, changed=None, tolerance=None):
+    """diagram for new sites and weights, rebuilding only the polygons of the
+    changed cells and of their neighbors before and after the change (the
+    cells whose sites or weights differ from the previous diagram's by default)
+
+    Falls back to make_diagram for weighted cells or different bounds, with
+    tolerance (see make_diagram)."""
+
+    same_bounds = getattr(diagram, 'bounds', None) == (bounds.left, bounds.top, bounds.w, bounds.h)
+    if (diagram.labels is None or is_weighted(weights) or not same_bounds
+            or len(diagram.sites) != len(sites)):
+        return make_diagram(options, bounds, sites, weights, tolerance)
+
+    if changed is None:
+        changed = np.any(sites != diagram.sites, axis=1) | (weights != diagram.weights)
+        changed = np.flatnonzero(changed)
+    changed = np.unique(np.asarray(changed, dtype=np.intp))
+    if not len(changed):
+        return _stamp(diagram, bounds, sites, weights)
+
+    moved = _pack(options, bounds, changed, *_unweighted(options, bounds, sites, changed))
+
+    owner = np.repeat(diagram.indices, np.diff(diagram.offsets))
+    before = diagram.labels[np.isin(owner, changed)]
+    around = np.union1d(before, moved.labels)
+    around = np.setdiff1d(around[around >= 0], changed)
+    if not len(around):
+        # every neighbor moved too
+        return _stamp(_merge(diagram, changed, [moved]), bounds, sites, weights)
+
+    rebuilt = _pack(options, bounds, around, *_unweighted(options, bounds, sites, around))
+    merged = _merge(diagram, np.union1d(changed, around), [moved, rebuilt])
+    return _stamp(merged, bounds, sites, weights)
+
+def diagram_neighbors(diagram, n, bounds):
+    """adjacency of the n cells of a diagram as CSR arrays (indptr, indices):
+    the neighbors of cell i are indices[indptr[i]:indptr[i+1]], sorted
+
+    Edges are read from the vertex labels when the diagram has them, otherwise
+    two cells are neighbors when they share at least two vertices."""
+
+    owner = np.repeat(diagram.indices, np.diff(diagram.offsets))
+
+    if diagram.labels is not None:
+        edge = diagram.labels >= 0
+        a, b = owner[edge], diagram.labels[edge]
+    else:
+        # merge the vertices closer than eps, so that the copies computed by
+        # each cell match wherever they fall
+        eps = 1e-8 * max(bounds.w, bounds.h)
+        group = _close_groups(diagram.vertices, eps)
+        keys = np.unique(np.column_stack((group, owner)), axis=0)
+        group, owner = keys[:, 0], keys[:, 1]
+
+        a, b = [], []
+        for shift in range(1, np.bincount(group).max()):
+            same = group[shift:] == group[:-shift]
+            a.append(owner[:-shift][same])
+            b.append(owner[shift:][same])
+        a = np.concatenate(a) if a else np.zeros(0, dtype=np.int64)
+        b = np.concatenate(b) if b else np.zeros(0, dtype=np.int64)
+
+        pair, shared = np.unique(np.minimum(a, b)*n + np.maximum(a, b), return_counts=True)
+        pair = pair[shared >= 2]
+        a, b = pair // n, pair % n
+
+    pair = np.unique(np.concatenate((a*n + b, b*n + a)))
+    pair = pair[pair // n != pair % n]
+    indptr = np.zeros(n+1, dtype=np.intp)
+    np.cumsum(np.bincount(pair // n, minlength=n), out=indptr[1:])
+    return indptr, (pair % n).astype(np.intp)
+
+def make_neighbors(options, bounds, sites, weights):
+    """CSR adjacency of the cells, from a single diagram build"""
+    return diagram_neighbors(make_diagram(options, bounds, sites, weights), len(sites), bounds)
+
+def neighbors_to_lists(indptr, indices):
+    return [indices[indptr[i]:indptr[i+1]].tolist() for i in range(len(indptr)-1)]
+
+def _ring(offsets):
+    """next vertex of every vertex in its polygon, and the polygon it is in"""
+
+    counts = np.diff(offsets)
+    owner = np.repeat(np.arange(len(counts)), counts)
+    nxt = np.arange(1, offsets[-1]+1)
+    full = counts > 0
+    nxt[offsets[1:][full] - 1] = offsets[:-1][full]
+    return nxt, owner
+
+def _compact(keep, owner, n):
+    offsets = np.zeros(n+1, dtype=np.intp)
+    np.cumsum(np.bincount(owner[keep], minlength=n), out=offsets[1:])
+    return offsets
+
+def _cross(a, b):
+    return a[..., 0]*b[..., 1] - a[..., 1]*b[..., 0]
+
+def _meet(p, d, q, e):
+    """intersections of the lines p + t*d and q + s*e, the middle of p and q
+    where they are parallel"""
+
+    det = _cross(d, e)
+    flat = np.abs(det) < 1e-12
+    t = _cross(q - p, e) / np.where(flat, 1, det)
+    return np.where(flat[:, None], (p + q) / 2, p + t[:, None]*d)
+
+def inset_polygons(vertices, offsets, margin):
+    """move every edge of the polygons vertices[offsets[k]:offsets[k+1]] inside
+    by margin, all polygons at once
+
+    Edges are offset along their normal and consecutive ones meet at their
+    miter, then the edges that came out reversed are collapsed into the
+    meeting point of their neighbors, which keeps the finely divided curved
+    edges of weighted cells in shape. Returns the new vertices and offsets,
+    the original index of every vertex left, and which polygons survived (the
+    others end up empty)."""
+
+    vertices = np.asarray(vertices, dtype=float)
+    n = len(offsets) - 1
+    nxt, owner = _ring(offsets)
+
+    # drop repeated vertices, including the closing one of complete polygons
+    edge = vertices[nxt] - vertices
+    length = np.hypot(edge[:, 0], edge[:, 1])
+    keep = length > 1e-12 * max(1, np.abs(vertices).max(initial=0))
+    ids = np.flatnonzero(keep)
+    offsets = _compact(keep, owner, n)
+    vertices, owner = vertices[ids], owner[ids]
+    nxt, _ = _ring(offsets)
+
+    # the outgoing edge of every vertex, as a unit direction and the line it
+    # is moved to, with the normal pointing inside whatever the orientation
+    edge = vertices[nxt] - vertices
+    d = edge / np.hypot(edge[:, 0], edge[:, 1])[:, None]
+    turn = np.sign(np.bincount(owner, _cross(vertices, vertices[nxt]), minlength=n))
+    normal = turn[owner, None] * np.column_stack((-d[:, 1], d[:, 0]))
+    line = vertices + margin*normal
+
+    prv = np.empty_like(nxt)
+    prv[nxt] = np.arange(len(nxt))
+    cos = np.einsum('ij,ij->i', normal[prv], normal)
+    # exact miters, the far ones of sharp corners are collapsed right after
+    moved = vertices + margin * (normal[prv] + normal) / np.maximum(1 + cos, 1e-9)[:, None]
+
+    while len(moved):
+        reversed_ = np.einsum('ij,ij->i', moved[nxt] - moved, d) <= 0
+        # only the first edge of a run of reversed edges, so that the merges
+        # of one pass never touch the same vertices
+        first = np.flatnonzero(reversed_ & ~reversed_[prv])
+        if not len(first):
+            break
+
+        before, after = prv[first], nxt[first]
+        moved[after] = _meet(line[before], d[before], line[after], d[after])
+        keep = np.ones(len(moved), dtype=bool)
+        keep[first] = False
+
+        kept = np.flatnonzero(keep)
+        offsets = _compact(keep, owner, n)
+        moved, d, line, owner, ids = moved[kept], d[kept], line[kept], owner[kept], ids[kept]
+        nxt, _ = _ring(offsets)
+        prv = np.empty_like(nxt)
+        prv[nxt] = np.arange(len(nxt))
+
+    # polygons that are still reversed (or flat) are thinner than the margin
+    counts = np.diff(offsets)
+    reversed_ = np.einsum('ij,ij->i', moved[nxt] - moved, d) <= 0
+    area = np.bincount(owner, _cross(moved, moved[nxt]), minlength=n)
+    alive = (counts >= 3) & (np.bincount(owner, reversed_, minlength=n) == 0)
+    alive &= np.sign(area) == turn
+
+    keep = alive[owner]
+    return moved[keep], _compact(keep, owner, n), ids[keep], alive
+
+def inset_diagram(diagram, margin):
+    """diagram with every polygon inset by margin, without the ones that
+    vanished (see inset_polygons)"""
+
+    vertices, offsets, ids, alive = inset_polygons(diagram.vertices, diagram.offsets, margin)
+    labels = None if diagram.labels is None else diagram.labels[ids]
+    offsets = np.r_[0, offsets[1:][alive]]
+    return Diagram(diagram.indices[alive], vertices, offsets, labels)
+
+class DiagramCache:
+    """bounded LRU memo of make_diagram, keyed by the sites and weights
+    quantized to precision along with the bounds, options and tolerance, so
+    that frames revisiting a configuration cost a lookup
+
+    The diagrams are shared between hits and must not be modified."""
+
+    def __init__(self, size=256, precision=1e-9):
+        self.size = size
+        self.precision = precision
+        self.diagrams = OrderedDict()
+        self.hits = self.misses = 0
+
+    def key(self, options, bounds, sites, weights, tolerance=None):
+        values = np.column_stack((sites, weights)) / self.precision
+        return (tuple(sorted(vars(options).items())), tolerance or None,
+                (bounds.left, bounds.top, bounds.w, bounds.h),
+                len(sites), np.round(values).astype(np.int64).tobytes())
+
+    def get(self, options, bounds, sites, weights, key=None, previous=None, tolerance=None):
+        """diagram of the sites, built from the previous diagram if given
+        (see update_diagram) when it is not cached"""
+
+        if key is None:
+            key = self.key(options, bounds, sites, weights, tolerance)
+        diagram = self.diagrams.get(key)
+
+        if diagram is None:
+            self.misses += 1
+            if previous is None:
+                diagram = make_diagram(options, bounds, sites, weights, tolerance)
+            else:
+                diagram = update_diagram(options, bounds, previous, sites, weights,
+                                         tolerance=tolerance)
+            self.diagrams[key] = diagram
+            if len(self.diagrams) > self.size:
+                self.diagrams.popitem(last=False)
+        else:
+            self.hits += 1
+            self.diagrams.move_to_end(key)
+
+        return diagram
+
+    def from_cells(self, options, bounds, cells):
+        return self.get(options, bounds, *cells_to_arrays(cells))
+
+    def clear(self):
+        self.diagrams.clear()
+        self.hits = self.misses = 0
+
+    def __repr__(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0
+        return (f'DiagramCache({len(self.diagrams)}/{self.size} diagrams, '
+                f'{self.hits} hits, {self.misses} misses, {rate:.0%} hit rate)')
+
+diagram_cache = DiagramCache()